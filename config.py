@@ -23,10 +23,71 @@ class Settings:
     DB_ENCRYPT: bool = _to_bool(os.getenv("DB_ENCRYPT"), True)
     DB_TRUST_SERVER_CERT: bool = _to_bool(os.getenv("DB_TRUST_SERVER_CERT"), True)
     DB_ENABLE_LOG: bool = _to_bool(os.getenv("DB_ENABLE_LOG"), False)
+    DB_FAST_EXECUTEMANY: bool = _to_bool(os.getenv("DB_FAST_EXECUTEMANY"), True)
+
+    # Connection pool, per engine (sync and async) and per worker process
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "5"))  # checkout wait before 503
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+    # Optional read replica (AlwaysOn readable secondary); empty host = primary only
+    DB_READ_HOST: str = os.getenv("DB_READ_HOST", "")
+    DB_READ_PORT: int = int(os.getenv("DB_READ_PORT", os.getenv("DB_PORT", "1433")))
+    DB_READ_MAX_LAG: float = float(os.getenv("DB_READ_MAX_LAG", "5"))  # seconds behind before falling back
+    DB_READ_CHECK_INTERVAL: float = float(os.getenv("DB_READ_CHECK_INTERVAL", "5"))
+    DB_READ_STICKY_SECONDS: float = float(os.getenv("DB_READ_STICKY_SECONDS", "15"))  # primary-only after a write
 
     JWT_SECRET: str = os.getenv("JWT_SECRET", "change-me")
     ACCESS_MIN: int = int(os.getenv("ACCESS_MIN", "15"))
     REFRESH_DAYS: int = int(os.getenv("REFRESH_DAYS", "15"))
+    JWT_CACHE_SIZE: int = int(os.getenv("JWT_CACHE_SIZE", "20000"))
+
+    # Refresh-token housekeeping
+    REFRESH_MAX_SESSIONS: int = int(os.getenv("REFRESH_MAX_SESSIONS", "10"))  # 0 = unlimited
+    REFRESH_SWEEP_ENABLED: bool = _to_bool(os.getenv("REFRESH_SWEEP_ENABLED"), True)
+    REFRESH_SWEEP_BATCH: int = int(os.getenv("REFRESH_SWEEP_BATCH", "500"))
+    REFRESH_SWEEP_PAUSE: float = float(os.getenv("REFRESH_SWEEP_PAUSE", "0.5"))  # between batches
+    REFRESH_SWEEP_INTERVAL: float = float(os.getenv("REFRESH_SWEEP_INTERVAL", "300"))  # between runs
+
+    # Write-behind for last_active and similar touches
+    TOUCH_FLUSH_INTERVAL: float = float(os.getenv("TOUCH_FLUSH_INTERVAL", "5"))
+    TOUCH_FLUSH_MAX: int = int(os.getenv("TOUCH_FLUSH_MAX", "500"))
+
+    # Password hashing pool (0 workers = hash inline on the AnyIO threadpool)
+    PASSWORD_WORKERS: int = int(os.getenv("PASSWORD_WORKERS", "2"))
+    PASSWORD_QUEUE_DEPTH: int = int(os.getenv("PASSWORD_QUEUE_DEPTH", "64"))
+
+    # Per-process principal cache used by get_current_user
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+    PRINCIPAL_CACHE_TTL: float = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
+    # Role registry: reload at most this often when a lookup misses
+    ROLE_MISS_RELOAD_INTERVAL: float = float(os.getenv("ROLE_MISS_RELOAD_INTERVAL", "30"))
+
+    # Pre-encoded JSON bodies (with ETags) for user and org reads
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "20000"))
+    RESPONSE_CACHE_TTL: float = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+
+    # /org/tree snapshot: rebuilt on local org creates, or after this many seconds
+    ORG_TREE_MAX_AGE: float = float(os.getenv("ORG_TREE_MAX_AGE", "300"))
+
+    # /org/headcount counters: full GROUP BY recount interval (incremental in between)
+    HEADCOUNT_RECOUNT_INTERVAL: float = float(os.getenv("HEADCOUNT_RECOUNT_INTERVAL", "300"))
+
+    # Profile photo blob store (content-addressed files; the DB keeps a reference)
+    PHOTO_DIR: str = os.getenv("PHOTO_DIR", "./data/photos")
+    PHOTO_MAX_BYTES: int = int(os.getenv("PHOTO_MAX_BYTES", str(5 * 1024 * 1024)))
+    PHOTO_THUMB_SIZE: int = int(os.getenv("PHOTO_THUMB_SIZE", "128"))
+    PHOTO_THUMB_WORKERS: int = int(os.getenv("PHOTO_THUMB_WORKERS", "1"))  # 0 = AnyIO threadpool
+
+    IMPORT_MAX_ROWS: int = int(os.getenv("IMPORT_MAX_ROWS", "20000"))
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+    BATCH_LOOKUP_MAX: int = int(os.getenv("BATCH_LOOKUP_MAX", "500"))
+
+    # In-memory typeahead index
+    DIRECTORY_REBUILD_INTERVAL: float = float(os.getenv("DIRECTORY_REBUILD_INTERVAL", "600"))
+    DIRECTORY_SCAN_CAP: int = int(os.getenv("DIRECTORY_SCAN_CAP", "5000"))  # postings read per token
 
     USERS_ENDPOINT_ALLOWED: list[str] = [
         r.strip()
@@ -1,40 +1,101 @@
+from fastapi import Request
 from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from urllib.parse import quote_plus
 from config import settings
+from utils.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, pool_metrics
+from utils.read_routing import read_router
 
 
-def _build_connection_url() -> str:
+def _build_connection_url(host: str | None = None, port: int | None = None, read_only: bool = False) -> str:
     driver = "ODBC Driver 18 for SQL Server"
     driver_enc = driver.replace(" ", "+")  # URL form: ODBC+Driver+18+for+SQL+Server
 
     user = settings.DB_USER
     pwd = quote_plus(settings.DB_PASSWORD.strip('"').strip("'"))
-    host = settings.DB_HOST
-    port = settings.DB_PORT
+    host = host or settings.DB_HOST
+    port = port or settings.DB_PORT
     db = settings.DB_NAME
 
     encrypt = "yes" if settings.DB_ENCRYPT else "no"
     trust = "yes" if settings.DB_TRUST_SERVER_CERT else "no"
 
-    return (
+    url = (
         f"mssql+pyodbc://{user}:{pwd}@{host}:{port}/{db}"
         f"?driver={driver_enc}"
         f"&Encrypt={encrypt}"
         f"&TrustServerCertificate={trust}"
     )
+    if read_only:
+        # AlwaysOn only accepts read-intent connections on a readable secondary
+        url += "&ApplicationIntent=ReadOnly"
+    return url
+
+
+def _pool_kwargs() -> dict:
+    # Each engine gets its own pool of this shape, per worker process.
+    return dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
 
 
 engine = create_engine(
     _build_connection_url(),
-    pool_pre_ping=True,
-    pool_recycle=1800,
+    poolclass=InstrumentedQueuePool,
+    **_pool_kwargs(),
     echo=settings.DB_ENABLE_LOG,
+    fast_executemany=settings.DB_FAST_EXECUTEMANY,  # pyodbc bulk parameter arrays
     future=True,
 )
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+# Async twin for read-heavy routes: same server, aioodbc driver, its own pool.
+async_engine = create_async_engine(
+    _build_connection_url().replace("mssql+pyodbc://", "mssql+aioodbc://", 1),
+    poolclass=InstrumentedAsyncQueuePool,
+    **_pool_kwargs(),
+    echo=settings.DB_ENABLE_LOG,
+)
+
+pool_metrics.attach("sync", engine.pool)
+pool_metrics.attach("async", async_engine.sync_engine.pool)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Optional read replica. Without DB_READ_HOST the read factories are the primary ones.
+read_engine = None
+async_read_engine = None
+ReadSessionLocal = SessionLocal
+AsyncReadSessionLocal = AsyncSessionLocal
+
+if settings.DB_READ_HOST:
+    _read_url = _build_connection_url(settings.DB_READ_HOST, settings.DB_READ_PORT, read_only=True)
+    read_engine = create_engine(
+        _read_url,
+        poolclass=InstrumentedQueuePool,
+        **_pool_kwargs(),
+        echo=settings.DB_ENABLE_LOG,
+        future=True,
+    )
+    async_read_engine = create_async_engine(
+        _read_url.replace("mssql+pyodbc://", "mssql+aioodbc://", 1),
+        poolclass=InstrumentedAsyncQueuePool,
+        **_pool_kwargs(),
+        echo=settings.DB_ENABLE_LOG,
+    )
+    ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, autocommit=False, future=True)
+    AsyncReadSessionLocal = async_sessionmaker(
+        bind=async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+    pool_metrics.attach("read_sync", read_engine.pool)
+    pool_metrics.attach("read_async", async_read_engine.sync_engine.pool)
+
 
 def get_db():
     db = SessionLocal()
@@ -44,7 +105,51 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def read_session_factory(request: Request):
+    """Replica sessions while it is healthy and the caller has not just written; else primary."""
+    return ReadSessionLocal if read_router.use_replica(request) else SessionLocal
+
+
+def get_read_db(request: Request):
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    factory = AsyncReadSessionLocal if read_router.use_replica(request) else AsyncSessionLocal
+    async with factory() as db:
+        yield db
+
+
 def ping_db() -> bool:
     with engine.connect() as conn:
         conn.execute(text("SELECT 1"))
     return True
+
+
+# Run on the primary: how far the furthest readable secondary's last commit trails
+# ours (NULL outside an availability group). Needs VIEW SERVER STATE.
+REPLICA_LAG_SQL = text(
+    "SELECT MAX(DATEDIFF(millisecond, s.last_commit_time, p.last_commit_time)) "
+    "FROM sys.dm_hadr_database_replica_states p "
+    "JOIN sys.dm_hadr_database_replica_states s "
+    "  ON s.group_database_id = p.group_database_id AND s.is_local = 0 "
+    "WHERE p.is_local = 1 AND p.database_id = DB_ID()"
+)
+
+
+def replica_lag_seconds() -> float:
+    """Ping the replica, then read its lag from the primary; raises if either is unreachable."""
+    with read_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    with engine.connect() as conn:
+        lag_ms = conn.execute(REPLICA_LAG_SQL).scalar()
+    return max(lag_ms or 0, 0) / 1000
@@ -1,14 +1,23 @@
 # main.py
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
 from sqlalchemy import text
 
 from config import settings
-from db import get_db, ping_db, SessionLocal
+from db import get_db, ping_db, replica_lag_seconds, SessionLocal
 from routes import api_router
 from routes import org_router
+from utils.directory_index import directory_index
+from utils.headcount import headcount
+from utils.password_pool import password_pool
+from utils.photo_store import photo_store
+from utils.read_routing import read_router, StickyWritesMiddleware
+from utils.role_registry import role_registry
+from utils.token_store import refresh_token_sweeper
+from utils.write_behind import user_touches
 
 # Router presence flag (kept from your code)
 try:
@@ -30,6 +39,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Pins a caller to the primary for a few seconds after their writes (no-op without a replica)
+app.add_middleware(StickyWritesMiddleware, router=read_router)
+
+# Pool exhausted for DB_POOL_TIMEOUT seconds: shed load instead of queueing further
+@app.exception_handler(PoolTimeoutError)
+async def _pool_timeout(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database busy, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # include all routers
 if ROUTERS_PRESENT:
     app.include_router(api_router)
@@ -40,15 +62,36 @@ if ROUTERS_PRESENT:
 def _startup():
     print("🚀 Starting FastAPI Server...")
     print(f"🔗 MSSQL: {settings.DB_HOST}:{settings.DB_PORT}")
+    if ROUTERS_PRESENT:
+        print("🧩 Routers loaded from routes/")
+
+    # Only the role warm-up needs the DB now; the registry loads lazily otherwise.
+    # The background loops below retry on their own, so they start regardless.
     try:
         ping_db()
         print("✅ Database connection OK.")
+        n_roles = role_registry.load()
+        print(f"🏷️ Role registry: {n_roles} role(s) loaded (v{role_registry.version})")
     except SQLAlchemyError as e:
         print("❌ Database connection failed:", e)
-        return
 
-    if ROUTERS_PRESENT:
-        print("🧩 Routers loaded from routes/")
+    read_router.start(replica_lag_seconds)
+    if read_router.enabled:
+        print(f"📖 Read replica: {settings.DB_READ_HOST}:{settings.DB_READ_PORT} (max lag {read_router.max_lag}s)")
+
+    directory_index.start()
+    headcount.start()
+
+    password_pool.start()
+    print(f"🔐 Password pool: {password_pool.workers} worker(s), queue depth {password_pool.queue_depth}")
+
+    photo_store.start()
+
+    user_touches.start()
+
+    if settings.REFRESH_SWEEP_ENABLED:
+        refresh_token_sweeper.start()
+        print("🧹 Refresh-token sweeper started.")
 
     # ---- seed super admin (idempotent, SQL-only) ----
     # try:
@@ -61,6 +104,17 @@ def _startup():
     print("✅ Startup complete.\n")
 
 
+@app.on_event("shutdown")
+def _shutdown():
+    directory_index.stop()
+    headcount.stop()
+    read_router.stop()
+    user_touches.stop()  # flushes pending last_active values
+    refresh_token_sweeper.stop()
+    password_pool.shutdown()
+    photo_store.shutdown()
+
+
 @app.get("/health")
 def health():
     return {"status": "ok", "version": "0.1.0"}
@@ -2,14 +2,18 @@
 from __future__ import annotations
 from typing import Optional
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import BigInteger, String, Boolean, DateTime, Integer, ForeignKey
+from sqlalchemy import BigInteger, String, Boolean, DateTime, Integer, ForeignKey, Index
 from datetime import datetime
 from .base import Base
 
 
 class AuthUser(Base):
     __tablename__ = "users"
-    __table_args__ = {"schema": "dbo"}
+    __table_args__ = (
+        Index("ix_users_created", "created_at", "user_id"),  # keyset paging
+        Index("ix_users_role", "user_role_id"),
+        {"schema": "dbo"},
+    )
 
     user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
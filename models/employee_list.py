@@ -2,14 +2,22 @@
 from __future__ import annotations
 from typing import Optional
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import BigInteger, String, Date, DateTime, Integer, ForeignKey
+from sqlalchemy import BigInteger, String, Date, DateTime, Integer, ForeignKey, Index
 from datetime import datetime, date
 from .base import Base
 
 
 class Employee(Base):
     __tablename__ = "employee_list"
-    __table_args__ = {"schema": "dbo"}
+    __table_args__ = (
+        # directory filters (/auth/users)
+        Index("ix_employee_org", "dept_id", "sub_dept_id", "designation_id"),
+        Index("ix_employee_sub_dept", "sub_dept_id"),
+        Index("ix_employee_designation", "designation_id"),
+        Index("ix_employee_card", "card_id"),
+        Index("ix_employee_name", "full_name"),
+        {"schema": "dbo"},
+    )
 
     user_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("dbo.users.user_id", ondelete="CASCADE"), primary_key=True
@@ -18,7 +26,9 @@ class Employee(Base):
     card_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
 
     full_name: Mapped[str] = mapped_column(String(120), nullable=False)
-    profile_photo: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # "sha256:<hex>" reference into utils.photo_store (legacy rows may still hold inline base64
+    # until migrate_inline_photos runs); deferred so directory loads never fetch it
+    profile_photo: Mapped[Optional[str]] = mapped_column(String, nullable=True, deferred=True)
     phone: Mapped[Optional[str]] = mapped_column(String(32))
     address: Mapped[Optional[str]] = mapped_column(String(255))
 
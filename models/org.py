@@ -1,18 +1,37 @@
 from __future__ import annotations
 from datetime import datetime
 from sqlalchemy import (
-    String, Integer, DateTime, ForeignKey, UniqueConstraint
+    String, Integer, DateTime, ForeignKey, Index
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from .base import Base
 
 
+# ---------- Name keys ----------
+def norm_name(s: str) -> str:
+    """Normalize names for idempotency (trim & collapse spaces)."""
+    return " ".join(s.strip().split())
+
+
+def name_key(s: str) -> str:
+    """Case-insensitive lookup key stored next to each org name (indexed, unique per scope)."""
+    return norm_name(s).lower()
+
+
+def _key_default(name_column: str):
+    """INSERT default for Core/bulk inserts that do not go through the ORM validators."""
+    def fn(ctx):
+        return name_key(ctx.get_current_parameters()[name_column])
+    return fn
+
+
 # ---------- Department ----------
 class Department(Base):
     __tablename__ = "department_list"
 
     dept_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     dept_name: Mapped[str] = mapped_column(String(150), unique=True, nullable=False)
+    dept_key: Mapped[str] = mapped_column(String(150), nullable=False, default=_key_default("dept_name"))
     description: Mapped[str | None] = mapped_column(String(500))
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     created_by: Mapped[int | None] = mapped_column(Integer)
@@ -25,6 +44,15 @@ class Department(Base):
         passive_deletes=False,  # MSSQL multi-cascade safety
     )
 
+    __table_args__ = (
+        Index("ux_department_key", "dept_key", unique=True),
+    )
+
+    @validates("dept_name")
+    def _set_key(self, _, value):
+        self.dept_key = name_key(value)
+        return value
+
 
 # ---------- Sub-Department ----------
 class SubDepartment(Base):
@@ -32,6 +60,7 @@ class SubDepartment(Base):
 
     sub_dept_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sub_dept_name: Mapped[str] = mapped_column(String(150), nullable=False)
+    sub_dept_key: Mapped[str] = mapped_column(String(150), nullable=False, default=_key_default("sub_dept_name"))
     dept_id: Mapped[int] = mapped_column(
         ForeignKey("department_list.dept_id", ondelete="NO ACTION", onupdate="NO ACTION"),
         nullable=False,
@@ -45,9 +74,14 @@ class SubDepartment(Base):
     department: Mapped["Department"] = relationship(back_populates="sub_departments")
 
     __table_args__ = (
-        UniqueConstraint("dept_id", "sub_dept_name", name="uq_subdept_per_dept"),
+        Index("ux_subdept_key", "dept_id", "sub_dept_key", unique=True),
     )
 
+    @validates("sub_dept_name")
+    def _set_key(self, _, value):
+        self.sub_dept_key = name_key(value)
+        return value
+
 
 # ---------- Designation ----------
 class Designation(Base):
@@ -55,6 +89,9 @@ class Designation(Base):
 
     designation_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     designation_name: Mapped[str] = mapped_column(String(150), nullable=False)
+    designation_key: Mapped[str] = mapped_column(
+        String(150), nullable=False, default=_key_default("designation_name")
+    )
     dept_id: Mapped[int | None] = mapped_column(
         ForeignKey("department_list.dept_id", ondelete="NO ACTION", onupdate="NO ACTION"),
         nullable=True,
@@ -70,5 +107,11 @@ class Designation(Base):
     updated_by: Mapped[int | None] = mapped_column(Integer)
 
     __table_args__ = (
-        UniqueConstraint("designation_name", "dept_id", "sub_dept_id", name="uq_desig_per_scope"),
+        # lookups filter on the key first, so it leads the index
+        Index("ux_desig_key", "designation_key", "dept_id", "sub_dept_id", unique=True),
     )
+
+    @validates("designation_name")
+    def _set_key(self, _, value):
+        self.designation_key = name_key(value)
+        return value
@@ -2,20 +2,31 @@
 from __future__ import annotations
 from typing import Optional
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import BigInteger, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import BigInteger, Integer, String, Boolean, DateTime, ForeignKey, BINARY, Index
 from datetime import datetime
 from .base import Base
 
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
-    __table_args__ = {"schema": "dbo"}
+    __table_args__ = (
+        # active-token lookup: seek on the digest, everything else read from the leaf
+        Index(
+            "ux_refresh_tokens_hash", "token_hash", unique=True,
+            mssql_include=["user_id", "revoked", "expires_at"],
+        ),
+        # per-user session cap
+        Index("ix_refresh_tokens_user", "user_id", "revoked", "expires_at"),
+        # background sweeper
+        Index("ix_refresh_tokens_sweep", "revoked", "expires_at"),
+        {"schema": "dbo"},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("dbo.users.user_id", ondelete="CASCADE"), nullable=False
     )
-    token_hash: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
+    token_hash: Mapped[bytes] = mapped_column(BINARY(32), nullable=False)  # raw sha256
     expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     revoked: Mapped[bool] = mapped_column(Boolean, default=False)
     user_agent: Mapped[Optional[str]] = mapped_column(String(255))
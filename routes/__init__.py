@@ -4,7 +4,11 @@ from fastapi import APIRouter
 
 from .auth_router import router as auth_router
 from .org import router as org_router
+from .admin import router as admin_router
+from .photos import router as photos_router
 
 api_router = APIRouter()
 api_router.include_router(auth_router)
 api_router.include_router(org_router)
+api_router.include_router(admin_router)
+api_router.include_router(photos_router)
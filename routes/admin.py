@@ -0,0 +1,40 @@
+# routes/admin.py
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+
+from utils.directory_index import directory_index
+from utils.headcount import headcount
+from utils.org_tree import org_tree
+from utils.password_pool import password_pool
+from utils.photo_store import photo_store
+from utils.pool_metrics import pool_metrics
+from utils.principal_cache import principal_cache
+from utils.read_routing import read_router
+from utils.response_cache import response_cache
+from utils.role_registry import role_registry
+from utils.security import token_cache
+from utils.token_store import refresh_token_sweeper
+from utils.write_behind import user_touches
+from .auth_router import require_roles, USERS_ENDPOINT_ALLOWED
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/metrics", summary="In-process service metrics (pools, caches, queues)")
+def metrics(_current=Depends(require_roles(*USERS_ENDPOINT_ALLOWED))):
+    return {
+        "db_pools": pool_metrics.stats(),
+        "headcount": headcount.stats(),
+        "org_tree": org_tree.stats(),
+        "password_pool": password_pool.stats(),
+        "photo_store": photo_store.stats(),
+        "principal_cache": principal_cache.stats(),
+        "read_routing": read_router.stats(),
+        "response_cache": response_cache.stats(),
+        "role_registry": role_registry.stats(),
+        "token_cache": token_cache.stats(),
+        "refresh_token_sweeper": refresh_token_sweeper.stats(),
+        "user_touches": user_touches.stats(),
+        "directory_index": directory_index.stats(),
+    }
@@ -1,56 +1,76 @@
 from __future__ import annotations
 from datetime import datetime
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Header, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import select
-from sqlalchemy.sql import false
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
 
 from config import settings
-from db import get_db
-from models import AuthUser, Role, Employee, RefreshToken
+from db import get_db, get_async_read_db, read_session_factory, AsyncSessionLocal
+from models import AuthUser, Employee, Role
+from utils.directory_index import directory_index
+from utils.headcount import headcount, placement_of, placements
+from utils.pagination import encode_cursor, decode_cursor
+from utils.password_pool import password_pool
+from utils.principal_cache import Principal, principal_cache, invalidate_principal
+from utils.response_cache import response_cache
+from utils.role_registry import role_registry
 from utils.security import (
-    hash_password,
-    verify_password,
     create_access_token,
     decode_access_token,
-    make_refresh_token,
-    refresh_exp,
     normalise_role,
-    maybe_rehash_after_verify,
 )
+from utils.user_batch import EMPLOYEE_PATCH_FIELDS, apply_patches
+from utils.user_export import export_query, iter_export
+from utils.user_import import parse_rows, prepare_import, insert_accepted
+from utils.user_queries import (
+    ProjectionFields,
+    UserFilters,
+    user_filters,
+    apply_user_filters,
+    parse_fields,
+    projection_options,
+    shape_user,
+)
+from utils.token_store import add_refresh_token, revoke_refresh_token
+from utils.write_behind import user_touches
 
 router = APIRouter(prefix="/auth", tags=["Authorization"])
 
 
 # ---------- Helpers ----------
-def get_role_by_name(db: Session, name: str) -> Role | None:
-    return db.scalar(select(Role).where(Role.role_name == name))
-
-
-def ensure_role(db: Session, name: str) -> Role:
-    n = normalise_role(name)
-    r = get_role_by_name(db, n)
-    if not r:
-        r = Role(role_name=n)
-        db.add(r)
-        db.commit()
-        db.refresh(r)
-    return r
+def user_with_profile():
+    """
+    SELECT (AuthUser, role_name) with Employee joined in. The role name comes
+    from the join, not the registry, so a body built from it is never cached
+    with a role the registry has not loaded yet.
+    """
+    return (
+        select(AuthUser, Role.role_name)
+        .outerjoin(Role, Role.role_id == AuthUser.user_role_id)
+        .options(joinedload(AuthUser.Employee))
+    )
 
 
-def resolve_default_role(db: Session) -> str:
-    env_default = normalise_role(getattr(settings, "DEFAULT_ROLE", None))
-    if env_default and get_role_by_name(db, env_default):
-        return env_default
-    # fallback to EMPLOYEE if exists; else create it
-    r = ensure_role(db, "EMPLOYEE")
-    return r.role_name
+def user_listing(fields: Optional[ProjectionFields] = None):
+    """
+    users LEFT JOIN employee_list in one query, so Employee columns can be filtered on.
+    With a ProjectionFields only the requested columns are selected.
+    """
+    stmt = select(AuthUser).outerjoin(AuthUser.Employee)
+    if fields is None:
+        return stmt.options(contains_eager(AuthUser.Employee))
+    return stmt.options(*projection_options(fields))
 
 
-def to_user_response(u: AuthUser) -> dict:
+def to_user_response(u: AuthUser, role_name: Optional[str] = None) -> dict:
     e = u.Employee
-    role_name = u.Role.role_name if u.Role else None
+    if role_name is None:
+        role_name = role_registry.name_for(u.user_role_id)
     # prefer employee full_name if available (your SQL users has no full_name)
     full_name = e.full_name if e and e.full_name else None
 
@@ -86,8 +106,29 @@ def to_user_response(u: AuthUser) -> dict:
     }
 
 
+def user_changed(user_id: int) -> None:
+    """Drop this process's cached principal and serialized user body after a committed write."""
+    invalidate_principal(user_id)
+    response_cache.invalidate("user", user_id)
+
+
 # ---------- Auth dependencies ----------
-def get_current_user(db: Session = Depends(get_db), authorization: str = Header(None)) -> AuthUser:
+async def _load_principal(uid: int) -> Optional[Principal]:
+    """One joined SELECT for user + role + employee; only runs on a cache miss."""
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(user_with_profile().where(AuthUser.user_id == uid))).first()
+        if not row:
+            return None
+        u, role_name = row
+        return Principal(
+            user_id=u.user_id,
+            is_active=u.is_active,
+            role=role_name,
+            profile=to_user_response(u, role_name),
+        )
+
+
+async def get_current_user(authorization: str = Header(None)) -> Principal:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Not authenticated")
     token = authorization[7:].strip()
@@ -97,19 +138,21 @@ def get_current_user(db: Session = Depends(get_db), authorization: str = Header(
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or expired access token")
 
-    u = db.get(AuthUser, uid)
-    if not u or not u.is_active:
+    p = principal_cache.get(uid)
+    if p is None:
+        p = await _load_principal(uid)
+        if p is not None:
+            principal_cache.set(uid, p)
+    if not p or not p.is_active:
         raise HTTPException(status_code=401, detail="User not found or inactive")
-    _ = u.Role, u.Employee  # eager
-    return u
+    return p
 
 
 def require_roles(*allowed: str):
     allowed_set = {normalise_role(r) for r in allowed}
 
-    def inner(user: AuthUser = Depends(get_current_user)):
-        user_role = user.Role.role_name if user.Role else None
-        if user_role not in allowed_set:
+    def inner(user: Principal = Depends(get_current_user)):
+        if user.role not in allowed_set:
             raise HTTPException(status_code=403, detail="Forbidden")
         return user
 
@@ -121,80 +164,109 @@ USER_GET_ENDPOINT_ALLOWED = [normalise_role(r) for r in settings.USER_GET_ENDPOI
 
 
 # ---------- Public endpoints ----------
-@router.post("/register")
-def register(payload: dict, db: Session = Depends(get_db)):
-    email = payload.get("email")
-    password = payload.get("password")
-    if not (email and password):
-        raise HTTPException(status_code=400, detail="email and password are required")
-
-    exists = db.scalar(select(AuthUser).where(AuthUser.email == email))
+def _check_register(db: Session, email: str) -> int:
+    try:
+        exists = db.scalar(select(AuthUser).where(AuthUser.email == email))
+    finally:
+        db.close()  # release the connection before the caller awaits bcrypt
     if exists:
         raise HTTPException(status_code=409, detail="Email already exists")
 
     # assign default role
-    role_name = resolve_default_role(db)
-    r = ensure_role(db, role_name)
+    return role_registry.ensure(role_registry.default_role())
+
 
+def _insert_registered_user(db: Session, email: str, pwd_hash: str, role_id: int) -> dict:
     user = AuthUser(
         email=email,
-        password_hash=hash_password(password),
-        user_role_id=r.role_id,
+        password_hash=pwd_hash,
+        user_role_id=role_id,
     )
     db.add(user)
     db.commit()
     db.refresh(user)
-    _ = user.Role, user.Employee
+    _ = user.Employee
+    directory_index.upsert_user(user)
     return to_user_response(user)
 
 
-@router.post("/login")
-def login(payload: dict, request: Request, db: Session = Depends(get_db)):
+@router.post("/register")
+async def register(payload: dict, db: Session = Depends(get_db)):
     email = payload.get("email")
     password = payload.get("password")
     if not (email and password):
         raise HTTPException(status_code=400, detail="email and password are required")
 
-    u = db.scalar(select(AuthUser).where(AuthUser.email == email))
-    if not u or not verify_password(password, u.password_hash):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
+    role_id = await run_in_threadpool(_check_register, db, email)
+    pwd_hash = await password_pool.hash(password)
+    return await run_in_threadpool(_insert_registered_user, db, email, pwd_hash, role_id)
 
-    if (new_hash := maybe_rehash_after_verify(password, u.password_hash)):
-        u.password_hash = new_hash
-        db.commit()
-        db.refresh(u)
-
-    u.last_active = datetime.utcnow()
-    db.commit()
-    db.refresh(u)
 
-    _ = u.Role, u.Employee
-    role_name = u.Role.role_name if u.Role else None
-    roles_claim = [role_name] if role_name else []
-    access_token = create_access_token(str(u.user_id), roles_claim)
-
-    rt_raw = make_refresh_token()
-    new_rt = RefreshToken(
-        user_id=u.user_id,
-        token_hash=rt_raw["digest"],
-        expires_at=refresh_exp(),
-        user_agent=str(request.headers.get("user-agent") or "")[:255],
+def _token_response(db: Session, u: AuthUser, role_name: Optional[str], request: Request) -> dict:
+    """
+    Stage a new refresh token, build the response from the already loaded user,
+    then commit once. last_active goes through the write-behind buffer.
+    """
+    now = datetime.utcnow()
+    user_touches.touch(u.user_id, last_active=now)
+    refresh_raw = add_refresh_token(
+        db,
+        u.user_id,
+        user_agent=request.headers.get("user-agent"),
         ip=request.client.host if request.client else None,
     )
-    db.add(new_rt)
-    db.commit()
 
-    return {
-        "access_token": access_token,
-        "refresh_token": rt_raw["raw"],
+    roles_claim = [role_name] if role_name else []
+    body = {
+        "access_token": create_access_token(str(u.user_id), roles_claim),
+        "refresh_token": refresh_raw,
         "token_type": "bearer",
-        "user": to_user_response(u),
+        "user": {**to_user_response(u, role_name), "last_active": now},
     }
+    db.commit()
+    return body
+
+
+def _finish_login(
+        db: Session, u: AuthUser, role_name: Optional[str], new_hash: Optional[str], request: Request
+) -> dict:
+    if new_hash:  # u is detached (see _find_login)
+        db.execute(update(AuthUser).where(AuthUser.user_id == u.user_id).values(password_hash=new_hash))
+    return _token_response(db, u, role_name, request)
+
+
+def _find_login(db: Session, email: str):
+    """
+    (AuthUser, role_name) or None. The session is closed before returning, so no
+    pooled connection is held while bcrypt runs; the user stays loaded but detached.
+    """
+    try:
+        return db.execute(user_with_profile().where(AuthUser.email == email)).first()
+    finally:
+        db.close()
+
+
+@router.post("/login")
+async def login(payload: dict, request: Request, db: Session = Depends(get_db)):
+    email = payload.get("email")
+    password = payload.get("password")
+    if not (email and password):
+        raise HTTPException(status_code=400, detail="email and password are required")
+
+    row = await run_in_threadpool(_find_login, db, email)
+    if not row:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    u, role_name = row
+    ok, new_hash = await password_pool.verify(password, u.password_hash)
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    return await run_in_threadpool(_finish_login, db, u, role_name, new_hash, request)
 
 
 @router.get("/me")
-def me(current: AuthUser = Depends(get_current_user)):
-    return to_user_response(current)
+async def me(request: Request, current: Principal = Depends(get_current_user)):
+    return response_cache.respond(request, "user", current.user_id, lambda: current.profile)
 
 
 @router.post("/refresh")
@@ -203,79 +275,39 @@ def refresh(payload: dict | None, request: Request, db: Session = Depends(get_db
     if not token:
         raise HTTPException(status_code=401, detail="Missing refresh token")
 
-    from hashlib import sha256 as _sha256
-    digest = _sha256(token.encode("utf-8")).hexdigest()
-
-    rt = db.scalar(
-        select(RefreshToken).where(
-            RefreshToken.token_hash == digest,
-            RefreshToken.revoked == false()  # or keep == False if you prefer
-        )
-    )
-    now = datetime.utcnow()
-    if not rt or rt.expires_at <= now:
+    user_id = revoke_refresh_token(db, token)
+    if user_id is None:
+        db.rollback()
         raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
 
-    u = db.get(AuthUser, rt.user_id)
-    if not u or not u.is_active:
+    row = db.execute(user_with_profile().where(AuthUser.user_id == user_id)).first()
+    if not row or not row[0].is_active:
+        db.rollback()
         raise HTTPException(status_code=401, detail="User inactive or missing")
 
-    u.last_active = datetime.utcnow()
-    db.commit()
-
-    rt.revoked = True
-    db.commit()
-
-    new_pair = make_refresh_token()
-    db.add(
-        RefreshToken(
-            user_id=u.user_id,
-            token_hash=new_pair["digest"],
-            expires_at=refresh_exp(),
-            user_agent=str(request.headers.get("user-agent") or "")[:255],
-            ip=request.client.host if request.client else None,
-        )
-    )
-    db.commit()
-
-    _ = u.Role, u.Employee
-    role_name = u.Role.role_name if u.Role else None
-    roles_claim = [role_name] if role_name else []
-    new_access = create_access_token(str(u.user_id), roles_claim)
-
-    return {
-        "access_token": new_access,
-        "refresh_token": new_pair["raw"],
-        "token_type": "bearer",
-        "user": to_user_response(u),
-    }
+    return _token_response(db, *row, request)
 
 
 # ---------- Admin endpoints ----------
-@router.post("/users")
-def create_user(
-        payload: dict,
-        db: Session = Depends(get_db),
-        _current: AuthUser = Depends(require_roles(*USERS_ENDPOINT_ALLOWED)),
-):
-    required = ["email", "password", "employee_id", "full_name"]
-    missing = [k for k in required if not payload.get(k)]
-    if missing:
-        raise HTTPException(status_code=400, detail=f"Missing fields: {', '.join(missing)}")
-
-    if db.scalar(select(AuthUser).where(AuthUser.email == payload["email"])):
-        raise HTTPException(status_code=400, detail="Email already exists")
-    if db.scalar(select(Employee).where(Employee.employee_id == payload["employee_id"])):
-        raise HTTPException(status_code=400, detail="employee_id already exists")
+def _check_create_user(db: Session, payload: dict) -> int:
+    try:
+        if db.scalar(select(AuthUser).where(AuthUser.email == payload["email"])):
+            raise HTTPException(status_code=400, detail="Email already exists")
+        if db.scalar(select(Employee).where(Employee.employee_id == payload["employee_id"])):
+            raise HTTPException(status_code=400, detail="employee_id already exists")
+    finally:
+        db.close()  # release the connection before the caller awaits bcrypt
 
     # role
-    wanted_role = normalise_role(payload.get("role")) or resolve_default_role(db)
-    r = ensure_role(db, wanted_role)
+    wanted_role = normalise_role(payload.get("role")) or role_registry.default_role()
+    return role_registry.ensure(wanted_role)
 
+
+def _insert_user_with_employee(db: Session, payload: dict, pwd_hash: str, role_id: int) -> dict:
     u = AuthUser(
         email=payload["email"],
-        password_hash=hash_password(payload["password"]),
-        user_role_id=r.role_id,
+        password_hash=pwd_hash,
+        user_role_id=role_id,
     )
     db.add(u)
     db.commit()
@@ -298,42 +330,220 @@ def create_user(
     )
     db.add(e)
     db.commit()
+    user_changed(u.user_id)
     db.refresh(u)
-    _ = u.Role, u.Employee
+    _ = u.Employee
+    directory_index.upsert_user(u)
+    headcount.move(None, placement_of(u))
     return to_user_response(u)
 
 
+@router.post("/users")
+async def create_user(
+        payload: dict,
+        db: Session = Depends(get_db),
+        _current: Principal = Depends(require_roles(*USERS_ENDPOINT_ALLOWED)),
+):
+    required = ["email", "password", "employee_id", "full_name"]
+    missing = [k for k in required if not payload.get(k)]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing fields: {', '.join(missing)}")
+
+    role_id = await run_in_threadpool(_check_create_user, db, payload)
+    pwd_hash = await password_pool.hash(payload["password"])
+    return await run_in_threadpool(_insert_user_with_employee, db, payload, pwd_hash, role_id)
+
+
+def _commit_import(db: Session, accepted: list, hashes: list, report: list) -> None:
+    try:
+        insert_accepted(db, accepted, hashes, report)
+        db.commit()
+        for r in accepted:
+            directory_index.upsert({**r, "user_id": report[r["_i"]]["user_id"], "is_active": True})
+            headcount.move(None, (r["dept_id"], r["sub_dept_id"], r["designation_id"], True))
+    except IntegrityError:
+        # lost a race with a concurrent create; nothing from this upload was kept
+        db.rollback()
+        for r in accepted:
+            report[r["_i"]].update(status="failed", errors=["Conflict while inserting, retry"])
+            report[r["_i"]].pop("user_id", None)
+
+
+def _check_import(db: Session, raw_rows: list):
+    try:
+        return prepare_import(db, raw_rows)
+    finally:
+        db.close()  # release the connection before hash_many, which can take minutes
+
+
+@router.post("/users/import")
+async def import_users(
+        request: Request,
+        db: Session = Depends(get_db),
+        _current: Principal = Depends(require_roles(*USERS_ENDPOINT_ALLOWED)),
+):
+    """
+    Bulk-create users + employees from CSV (Content-Type: text/csv) or NDJSON.
+    Valid rows are inserted in one transaction; the response reports every row.
+    """
+    raw_rows = parse_rows(await request.body(), request.headers.get("content-type", ""))
+    if len(raw_rows) > settings.IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.IMPORT_MAX_ROWS} rows per import")
+
+    report, accepted = await run_in_threadpool(_check_import, db, raw_rows)
+    hashes = await password_pool.hash_many([r["password"] for r in accepted])
+    if accepted:
+        await run_in_threadpool(_commit_import, db, accepted, hashes, report)
+
+    counts: dict = {}
+    for r in report:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return {"summary": counts, "rows": report}
+
+
 @router.get("/users")
-def list_users(
-        q: Optional[str] = None,
-        employee_id: Optional[str] = None,
+async def list_users(
+        filters: UserFilters = Depends(user_filters),
+        limit: int = Query(50, ge=1, le=500),
+        cursor: Optional[str] = None,
+        fields: Optional[str] = Query(
+            None, description="Comma-separated response fields, e.g. user_id,email,full_name or employee.dept_id"
+        ),
+        db: AsyncSession = Depends(get_async_read_db),
+        _current: Principal = Depends(require_roles(*USERS_ENDPOINT_ALLOWED)),
+):
+    # one query: users LEFT JOIN employee, keyset on (created_at, user_id) DESC;
+    # ?fields= narrows both the SELECT list and the response
+    fs = parse_fields(fields)
+    stmt = user_listing(fs).order_by(AuthUser.created_at.desc(), AuthUser.user_id.desc())
+    stmt = apply_user_filters(stmt, filters)
+    if cursor:
+        c_at, c_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                AuthUser.created_at < c_at,
+                and_(AuthUser.created_at == c_at, AuthUser.user_id < c_id),
+            )
+        )
+
+    rows = (await db.scalars(stmt.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    last = rows[-1] if rows else None
+    return {
+        "items": [shape_user(u, fs) if fs else to_user_response(u) for u in rows],
+        "next_cursor": encode_cursor(last.created_at, last.user_id) if has_more else None,
+    }
+
+
+@router.get("/users/export")
+def export_users(
+        request: Request,
+        format: str = Query("csv", pattern="^(csv|ndjson)$"),
+        filters: UserFilters = Depends(user_filters),
+        _current: Principal = Depends(require_roles(*USERS_ENDPOINT_ALLOWED)),
+):
+    """Stream the directory as CSV or NDJSON; memory stays flat regardless of row count."""
+    media = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        iter_export(export_query(filters), format, read_session_factory(request)),
+        media_type=media,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
+
+
+@router.get("/users/typeahead")
+async def typeahead(
+        q: str = Query(..., min_length=1),
+        limit: int = Query(10, ge=1, le=50),
+        include_inactive: bool = False,
+        _current: Principal = Depends(require_roles(*USER_GET_ENDPOINT_ALLOWED)),
+):
+    """People-picker: prefix matches on name words, email, employee_id and card_id (in-memory)."""
+    if not directory_index.ready:
+        raise HTTPException(status_code=503, detail="Directory index is warming up", headers={"Retry-After": "2"})
+    return directory_index.search(q, limit=limit, include_inactive=include_inactive)
+
+
+@router.post("/users/batch")
+async def batch_get_users(
+        payload: dict,
+        db: AsyncSession = Depends(get_async_read_db),
+        _current: Principal = Depends(require_roles(*USER_GET_ENDPOINT_ALLOWED)),
+):
+    """
+    Look up many users at once: {"user_ids": [...], "employee_ids": [...]}.
+    One IN query (users + employees); ids that matched nothing are listed under "missing".
+    """
+    try:
+        user_ids = list(dict.fromkeys(int(x) for x in payload.get("user_ids") or []))
+        employee_ids = list(dict.fromkeys(str(x) for x in payload.get("employee_ids") or []))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="user_ids must be integers")
+    if len(user_ids) + len(employee_ids) > settings.BATCH_LOOKUP_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BATCH_LOOKUP_MAX} ids per lookup")
+    if not (user_ids or employee_ids):
+        return {"items": [], "missing": {"user_ids": [], "employee_ids": []}}
+
+    conds = []
+    if user_ids:
+        conds.append(AuthUser.user_id.in_(user_ids))
+    if employee_ids:
+        conds.append(Employee.employee_id.in_(employee_ids))
+    rows = (await db.scalars(user_listing().where(or_(*conds)).order_by(AuthUser.user_id))).all()
+
+    found_uids = {u.user_id for u in rows}
+    found_eids = {u.Employee.employee_id for u in rows if u.Employee}
+    return {
+        "items": [to_user_response(u) for u in rows],
+        "missing": {
+            "user_ids": [x for x in user_ids if x not in found_uids],
+            "employee_ids": [x for x in employee_ids if x not in found_eids],
+        },
+    }
+
+
+@router.patch("/users")
+def patch_users(
+        payload: List[dict],
         db: Session = Depends(get_db),
-        _current: AuthUser = Depends(require_roles(*USERS_ENDPOINT_ALLOWED)),
+        _current: Principal = Depends(require_roles(*USERS_ENDPOINT_ALLOWED)),
 ):
-    stmt = select(AuthUser).order_by(AuthUser.created_at.desc())
-    if q:
-        from sqlalchemy import or_ as _or
-        stmt = stmt.where(_or(AuthUser.email.ilike(f"%{q}%")))
-    rows = db.scalars(stmt).all()
+    """
+    Apply many partial updates ([{"user_id": 1, "dept_id": 3, ...}, ...]) in one
+    transaction and return the updated users from a single read.
+    """
+    if len(payload) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BATCH_MAX_ITEMS} items per batch")
+
+    before = placements(db, (item.get("user_id") for item in payload))
+    ids = apply_patches(db, payload)
+    db.commit()
+    for uid in ids:
+        user_changed(uid)
 
+    rows = db.scalars(user_listing().where(AuthUser.user_id.in_(ids)).order_by(AuthUser.user_id)).all()
     for u in rows:
-        _ = u.Role, u.Employee
-    if employee_id:
-        rows = [u for u in rows if u.Employee and u.Employee.employee_id == employee_id]
+        directory_index.upsert_user(u)
+        headcount.move(before.get(u.user_id), placement_of(u))
     return [to_user_response(u) for u in rows]
 
 
 @router.get("/users/{user_id}")
-def get_user(
+async def get_user(
         user_id: int,
-        db: Session = Depends(get_db),
-        _current: AuthUser = Depends(require_roles(*USER_GET_ENDPOINT_ALLOWED)),
+        request: Request,
+        db: AsyncSession = Depends(get_async_read_db),
+        _current: Principal = Depends(require_roles(*USER_GET_ENDPOINT_ALLOWED)),
 ):
-    u = db.get(AuthUser, user_id)
-    if not u:
-        raise HTTPException(status_code=404, detail="User not found")
-    _ = u.Role, u.Employee
-    return to_user_response(u)
+    async def build():
+        row = (await db.execute(user_with_profile().where(AuthUser.user_id == user_id))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
+        return to_user_response(*row)
+
+    # the session only checks out a connection on a cache miss
+    return await response_cache.respond_async(request, "user", user_id, build)
 
 
 @router.patch("/users/{user_id}")
@@ -341,26 +551,46 @@ def patch_user(
         user_id: int,
         payload: dict,
         db: Session = Depends(get_db),
-        _current: AuthUser = Depends(require_roles(*USERS_ENDPOINT_ALLOWED)),
+        _current: Principal = Depends(require_roles(*USERS_ENDPOINT_ALLOWED)),
 ):
     u = db.get(AuthUser, user_id)
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
+    before = placement_of(u)
+
+    now = datetime.utcnow()
 
     # toggle active
     if "is_active" in payload:
         u.is_active = bool(payload["is_active"])
 
+    # role change (a PATCH never creates roles, same as the batch PATCH)
+    if payload.get("role"):
+        role_id = role_registry.id_for(payload["role"])
+        if role_id is None:
+            raise HTTPException(
+                status_code=400, detail={"message": "Unknown roles", "roles": [normalise_role(payload["role"])]}
+            )
+        u.user_role_id = role_id
+
+    if "is_active" in payload or payload.get("role"):
+        u.updated_at = now
+
     # update employee subset if exists
     if u.Employee:
         e = u.Employee
-        for field in ["full_name", "phone", "address", "fathers_name", "aadhar_no",
-                      "date_of_birth", "work_position", "card_id",
-                      "dept_id", "sub_dept_id", "designation_id"]:
+        touched = False
+        for field in EMPLOYEE_PATCH_FIELDS:
             if field in payload:
                 setattr(e, field, payload[field])
+                touched = True
+        if touched:
+            e.updated_at = now
 
     db.commit()
+    user_changed(user_id)
     db.refresh(u)
-    _ = u.Role, u.Employee
+    _ = u.Employee
+    directory_index.upsert_user(u)
+    headcount.move(before, placement_of(u))
     return to_user_response(u)
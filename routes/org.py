@@ -2,42 +2,66 @@
 from __future__ import annotations
 
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
 
-from db import get_db
+from config import settings
+from db import get_db, get_async_read_db
 from models import Department, SubDepartment, Designation
 from schemas.org import (
     DepartmentIn, DepartmentOut,
     SubDepartmentIn, SubDepartmentOut,
     DesignationIn, DesignationOut,
     AddAllIn, AddAllOut,
+    AddAllBulkIn, AddAllBulkOut,
 )
 from utils.org_helpers import (
+    bulk_get_or_create,
     get_or_create_department,
     get_or_create_subdept,
     get_or_create_designation,
 )
+from utils.headcount import headcount
+from utils.org_tree import org_tree
+from utils.response_cache import response_cache, json_bytes_response
 
 router = APIRouter(prefix="/org", tags=["organization"])
 
 
+def _org_changed(*pairs) -> None:
+    """Drop cached bodies for written (kind, id) pairs and every list page of those kinds."""
+    for kind, ident in pairs:
+        response_cache.invalidate(kind, ident)
+        response_cache.invalidate(kind + "_list")
+        org_tree.note_write(kind, ident)
+
+
+def _dump(schema, rows) -> list:
+    return [schema.model_validate(r).model_dump() for r in rows]
+
+
 # -----------------------------
 # CREATE (existing)
 # -----------------------------
 @router.post("/departments", response_model=DepartmentOut)
 def create_department(payload: DepartmentIn, db: Session = Depends(get_db)):
     d = get_or_create_department(db, payload.dept_name, payload.description, payload.created_by)
+    out = DepartmentOut.model_validate(d)  # before commit expires the row, see create_all
     db.commit()
-    return d
+    _org_changed(("department", out.dept_id))
+    return out
 
 
 @router.post("/sub-departments", response_model=SubDepartmentOut)
 def create_sub_department(payload: SubDepartmentIn, db: Session = Depends(get_db)):
     sd = get_or_create_subdept(db, payload.dept_id, payload.sub_dept_name, payload.description, payload.created_by)
+    out = SubDepartmentOut.model_validate(sd)
     db.commit()
-    return sd
+    _org_changed(("sub_department", out.sub_dept_id))
+    return out
 
 
 @router.post("/designations", response_model=DesignationOut)
@@ -50,8 +74,10 @@ def create_designation(payload: DesignationIn, db: Session = Depends(get_db)):
         payload.description,
         payload.created_by,
     )
+    out = DesignationOut.model_validate(desig)
     db.commit()
-    return desig
+    _org_changed(("designation", out.designation_id))
+    return out
 
 
 @router.post("/add-all", response_model=AddAllOut)
@@ -65,64 +91,132 @@ def create_all(payload: AddAllIn, db: Session = Depends(get_db)):
             db, payload.designation_name, dept.dept_id, sub_dept.sub_dept_id, payload.designation_description,
             payload.created_by
         )
-    return AddAllOut(dept=dept, sub_dept=sub_dept, designation=designation)
+        # built before commit expires the rows: reloading them during serialization
+        # would check out a second connection, held until this request's teardown
+        out = AddAllOut(dept=dept, sub_dept=sub_dept, designation=designation)
+    _org_changed(
+        ("department", out.dept.dept_id),
+        ("sub_department", out.sub_dept.sub_dept_id),
+        ("designation", out.designation.designation_id),
+    )
+    return out
+
+
+@router.post("/add-all/bulk", response_model=AddAllBulkOut)
+def create_all_bulk(payload: AddAllBulkIn, db: Session = Depends(get_db)):
+    """
+    Many add-all triples in one transaction (e.g. an org-chart spreadsheet).
+    Returns the resolved ids for every input row, in input order.
+    """
+    if len(payload.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BATCH_MAX_ITEMS} items per batch")
+    with db.begin():
+        rows, created = bulk_get_or_create(db, payload.items)
+    _org_changed(*((kind, i) for kind, ids in created.items() for i in ids))
+    return {"created": {kind: len(ids) for kind, ids in created.items()}, "rows": rows}
 
 
 # -----------------------------
 # GET (added)
 # -----------------------------
 
-# Lists
+@router.get("/tree")
+async def get_org_tree(request: Request):
+    """Department -> SubDepartment -> Designation in one response (pre-serialized snapshot, ETag)."""
+    snapshot = org_tree.cached()
+    if snapshot is None:
+        snapshot = await run_in_threadpool(org_tree.get)  # rebuild: three sync SELECTs
+    return json_bytes_response(request, *snapshot)
+
+
+@router.get("/headcount")
+async def get_headcount(
+        request: Request,
+        dept_id: Optional[int] = None,
+        sub_dept_id: Optional[int] = None,
+        designation_id: Optional[int] = None,
+):
+    """
+    Active/inactive employees per org node from in-memory counters (never scans employee_list).
+    With one id filter returns that node; otherwise the whole table (pre-serialized, ETag).
+    """
+    if not headcount.ready:
+        raise HTTPException(status_code=503, detail="Headcount is warming up", headers={"Retry-After": "2"})
+    for kind, ident in (("designation", designation_id), ("sub_department", sub_dept_id), ("department", dept_id)):
+        if ident is not None:
+            return {"kind": kind, "id": ident, **headcount.node(kind, ident)}
+    body, etag = headcount.encoded()
+    return json_bytes_response(request, body, etag)
+
+
+# Lists and by-id lookups are served from pre-encoded bodies with strong ETags
+# (If-None-Match -> 304); the async session only touches the database on a cache miss.
 @router.get("/departments", response_model=List[DepartmentOut])
-def list_departments(db: Session = Depends(get_db)):
-    rows = db.scalars(select(Department).order_by(Department.dept_name)).all()
-    return rows
+async def list_departments(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    async def build():
+        return _dump(DepartmentOut, await db.scalars(select(Department).order_by(Department.dept_name)))
+
+    return await response_cache.respond_async(request, "department_list", None, build)
 
 
 @router.get("/sub-departments", response_model=List[SubDepartmentOut])
-def list_sub_departments(dept_id: Optional[int] = None, db: Session = Depends(get_db)):
-    stmt = select(SubDepartment)
-    if dept_id is not None:
-        stmt = stmt.where(SubDepartment.dept_id == dept_id)
-    rows = db.scalars(stmt.order_by(SubDepartment.sub_dept_name)).all()
-    return rows
+async def list_sub_departments(request: Request, dept_id: Optional[int] = None, db: AsyncSession = Depends(get_async_read_db)):
+    async def build():
+        stmt = select(SubDepartment)
+        if dept_id is not None:
+            stmt = stmt.where(SubDepartment.dept_id == dept_id)
+        return _dump(SubDepartmentOut, await db.scalars(stmt.order_by(SubDepartment.sub_dept_name)))
+
+    return await response_cache.respond_async(request, "sub_department_list", dept_id, build)
 
 
 @router.get("/designations", response_model=List[DesignationOut])
-def list_designations(
+async def list_designations(
+        request: Request,
         dept_id: Optional[int] = None,
         sub_dept_id: Optional[int] = None,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_read_db),
 ):
-    stmt = select(Designation)
-    if dept_id is not None:
-        stmt = stmt.where(Designation.dept_id == dept_id)
-    if sub_dept_id is not None:
-        stmt = stmt.where(Designation.sub_dept_id == sub_dept_id)
-    rows = db.scalars(stmt.order_by(Designation.designation_name)).all()
-    return rows
+    async def build():
+        stmt = select(Designation)
+        if dept_id is not None:
+            stmt = stmt.where(Designation.dept_id == dept_id)
+        if sub_dept_id is not None:
+            stmt = stmt.where(Designation.sub_dept_id == sub_dept_id)
+        return _dump(DesignationOut, await db.scalars(stmt.order_by(Designation.designation_name)))
+
+    return await response_cache.respond_async(request, "designation_list", (dept_id, sub_dept_id), build)
 
 
 # By ID
 @router.get("/departments/{dept_id}", response_model=DepartmentOut)
-def get_department(dept_id: int, db: Session = Depends(get_db)):
-    row = db.get(Department, dept_id)
-    if not row:
-        raise HTTPException(status_code=404, detail="Department not found")
-    return row
+async def get_department(dept_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    async def build():
+        row = await db.get(Department, dept_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Department not found")
+        return DepartmentOut.model_validate(row).model_dump()
+
+    return await response_cache.respond_async(request, "department", dept_id, build)
 
 
 @router.get("/sub-departments/{sub_dept_id}", response_model=SubDepartmentOut)
-def get_sub_department(sub_dept_id: int, db: Session = Depends(get_db)):
-    row = db.get(SubDepartment, sub_dept_id)
-    if not row:
-        raise HTTPException(status_code=404, detail="Sub-Department not found")
-    return row
+async def get_sub_department(sub_dept_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    async def build():
+        row = await db.get(SubDepartment, sub_dept_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Sub-Department not found")
+        return SubDepartmentOut.model_validate(row).model_dump()
+
+    return await response_cache.respond_async(request, "sub_department", sub_dept_id, build)
 
 
 @router.get("/designations/{designation_id}", response_model=DesignationOut)
-def get_designation(designation_id: int, db: Session = Depends(get_db)):
-    row = db.get(Designation, designation_id)
-    if not row:
-        raise HTTPException(status_code=404, detail="Designation not found")
-    return row
+async def get_designation(designation_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    async def build():
+        row = await db.get(Designation, designation_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Designation not found")
+        return DesignationOut.model_validate(row).model_dump()
+
+    return await response_cache.respond_async(request, "designation", designation_id, build)
@@ -0,0 +1,111 @@
+# routes/photos.py
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from db import get_db, get_read_db
+from models import Employee
+from utils.photo_store import REF_PREFIX, photo_store, is_ref, decode_inline, sniff
+from utils.principal_cache import Principal
+from utils.response_cache import etag_matches
+from .auth_router import get_current_user, user_changed, USERS_ENDPOINT_ALLOWED, USER_GET_ENDPOINT_ALLOWED
+
+router = APIRouter(prefix="/auth", tags=["Photos"])
+
+PHOTO_CACHE_CONTROL = "private, max-age=86400"
+
+
+def _check_access(current: Principal, user_id: int, allowed: list) -> None:
+    """Users may manage their own photo; anyone else needs one of the allowed roles."""
+    if current.user_id != user_id and current.role not in allowed:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+def _employee_exists(db: Session, user_id: int) -> bool:
+    return db.scalar(select(Employee.user_id).where(Employee.user_id == user_id)) is not None
+
+
+def _set_photo_ref(db: Session, user_id: int, ref: Optional[str]) -> None:
+    db.execute(
+        update(Employee)
+        .where(Employee.user_id == user_id)
+        .values(profile_photo=ref, updated_at=datetime.utcnow())
+    )
+    db.commit()
+    user_changed(user_id)
+
+
+@router.put("/users/{user_id}/photo")
+async def upload_photo(
+        user_id: int,
+        request: Request,
+        db: Session = Depends(get_db),
+        current: Principal = Depends(get_current_user),
+):
+    """Raw image body (JPEG/PNG/GIF/WebP), streamed to the blob store; the row keeps only the reference."""
+    _check_access(current, user_id, USERS_ENDPOINT_ALLOWED)
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > photo_store.max_bytes:
+        raise HTTPException(status_code=413, detail=f"Photo exceeds {photo_store.max_bytes} bytes")
+    if not await run_in_threadpool(_employee_exists, db, user_id):
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    digest, ctype = await photo_store.save_stream(request.stream())
+    thumb = await photo_store.make_thumbnail(digest)
+    ref = REF_PREFIX + digest
+    await run_in_threadpool(_set_photo_ref, db, user_id, ref)
+    return {"user_id": user_id, "photo": ref, "content_type": ctype, "thumbnail": thumb}
+
+
+@router.get("/users/{user_id}/photo")
+def download_photo(
+        user_id: int,
+        request: Request,
+        size: str = Query("full", pattern="^(full|thumb)$"),
+        db: Session = Depends(get_read_db),
+        current: Principal = Depends(get_current_user),
+):
+    """Serves the blob with a strong ETag (If-None-Match -> 304) and HTTP Range support."""
+    _check_access(current, user_id, USER_GET_ENDPOINT_ALLOWED)
+    ref = db.scalar(select(Employee.profile_photo).where(Employee.user_id == user_id))
+    if not ref:
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    if not is_ref(ref):
+        # not migrated yet: still inline base64
+        data = decode_inline(ref)
+        if data is None:
+            raise HTTPException(status_code=404, detail="Photo not found")
+        etag = f'"{hashlib.sha256(data).hexdigest()}"'  # same tag the blob gets once migrated
+        headers = {"ETag": etag, "Cache-Control": PHOTO_CACHE_CONTROL}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=data, media_type=sniff(data[:12]) or "application/octet-stream", headers=headers)
+
+    path, ctype, etag = photo_store.locate(ref, thumb=size == "thumb")
+    headers = {"ETag": etag, "Cache-Control": PHOTO_CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=ctype, headers=headers)
+
+
+@router.delete("/users/{user_id}/photo")
+def delete_photo(
+        user_id: int,
+        db: Session = Depends(get_db),
+        current: Principal = Depends(get_current_user),
+):
+    """Clears the reference; blobs are shared by digest and are not removed here."""
+    _check_access(current, user_id, USERS_ENDPOINT_ALLOWED)
+    if not _employee_exists(db, user_id):
+        raise HTTPException(status_code=404, detail="Employee not found")
+    _set_photo_ref(db, user_id, None)
+    return {"user_id": user_id, "photo": None}
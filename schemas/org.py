@@ -72,3 +72,20 @@ class AddAllOut(BaseModel):
     dept: DepartmentOut
     sub_dept: SubDepartmentOut
     designation: DesignationOut
+
+
+# -------- Create-All (bulk) --------
+class AddAllBulkIn(BaseModel):
+    items: List[AddAllIn] = Field(..., min_length=1)
+
+
+class AddAllRowOut(BaseModel):
+    row: int
+    dept_id: int
+    sub_dept_id: int
+    designation_id: int
+
+
+class AddAllBulkOut(BaseModel):
+    created: dict
+    rows: List[AddAllRowOut]
@@ -0,0 +1,97 @@
+# tests/conftest.py
+"""
+SQLite stand-in for the MSSQL database.
+
+db.py builds its engines at import time from config, so both create_engine and
+create_async_engine are pointed at one temporary SQLite file (with a "dbo"
+schema attached) before anything from the app is imported.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_TMP = tempfile.mkdtemp(prefix="hrms-tests-")
+DB_FILE = os.path.join(_TMP, "main.db")
+DBO_FILE = os.path.join(_TMP, "dbo.db")
+
+os.environ.update({
+    "USERS_ENDPOINT_ALLOWED": "ADMIN",
+    "USER_GET_ENDPOINT_ALLOWED": "ADMIN",
+    "PASSWORD_WORKERS": "0",
+    "PHOTO_THUMB_WORKERS": "0",
+    "PHOTO_DIR": os.path.join(_TMP, "photos"),
+    "DB_READ_HOST": "",
+    "DB_POOL_TIMEOUT": "120",  # SQLite serialises writers; stress tests queue, not 503
+})
+
+import sqlalchemy  # noqa: E402
+import sqlalchemy.ext.asyncio as sa_async  # noqa: E402
+from sqlalchemy import BigInteger, event, select  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+_create_engine, _create_async_engine = sqlalchemy.create_engine, sa_async.create_async_engine
+
+
+def _attach_dbo(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    cur.execute(f"ATTACH DATABASE '{DBO_FILE}' AS dbo")
+    cur.close()
+
+
+def _sqlite_engine(url, **kw):
+    kw.pop("fast_executemany", None)
+    engine = _create_engine(f"sqlite:///{DB_FILE}", connect_args={"timeout": 30}, **kw)
+    event.listen(engine, "connect", _attach_dbo)
+    return engine
+
+
+def _sqlite_async_engine(url, **kw):
+    engine = _create_async_engine(f"sqlite+aiosqlite:///{DB_FILE}", connect_args={"timeout": 30}, **kw)
+    event.listen(engine.sync_engine, "connect", _attach_dbo)
+    return engine
+
+
+@compiles(BigInteger, "sqlite")
+def _bigint_as_integer(type_, compiler, **kw):
+    return "INTEGER"  # so BigInteger primary keys autoincrement
+
+
+sqlalchemy.create_engine = _sqlite_engine
+sa_async.create_async_engine = _sqlite_async_engine
+
+import pytest  # noqa: E402
+
+import db  # noqa: E402
+from models import AuthUser, Base, Role  # noqa: E402
+
+Base.metadata.create_all(db.engine)
+
+
+@pytest.fixture
+def engine():
+    return db.engine
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # pooled aiosqlite connections each keep a non-daemon thread alive
+    asyncio.run(db.async_engine.dispose())
+
+
+@pytest.fixture
+def admin_id():
+    """A fresh user holding the ADMIN role (the role is created on first use)."""
+    with db.SessionLocal() as s:
+        role = s.scalar(select(Role).where(Role.role_name == "ADMIN"))
+        if role is None:
+            role = Role(role_name="ADMIN")
+            s.add(role)
+            s.flush()
+        u = AuthUser(email=f"admin-{uuid.uuid4().hex[:8]}@example.com", password_hash="x", user_role_id=role.role_id)
+        s.add(u)
+        s.commit()
+        return u.user_id
@@ -0,0 +1,94 @@
+# tests/test_org_concurrency.py
+"""Concurrency stress: parallel org creates for the same names all resolve to one row each."""
+import asyncio
+import uuid
+
+import httpx
+from sqlalchemy import func, select
+
+from db import SessionLocal
+from main import app
+from models import Department, Designation, SubDepartment
+from models.org import name_key
+
+CALLS = 300
+BULK_CALLS = 64
+
+
+async def _fire(requests):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        return await asyncio.gather(*(client.post(path, json=body) for path, body in requests))
+
+
+def _count(model, key_col, names) -> int:
+    """Rows whose case-insensitive key matches one of `names` (the first writer's spelling is stored)."""
+    keys = {name_key(n) for n in names}
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(model).where(getattr(model, key_col).in_(keys)))
+
+
+def test_parallel_add_all_same_names():
+    tag = uuid.uuid4().hex[:8]
+    body = {"dept_name": f"Eng {tag}", "sub_dept_name": f"Platform {tag}", "designation_name": f"SRE {tag}"}
+    # vary case/whitespace: they must land on the same rows
+    variants = [body, {k: v.upper() for k, v in body.items()}, {k: f"  {v} " for k, v in body.items()}]
+
+    responses = asyncio.run(_fire([("/org/add-all", variants[i % 3]) for i in range(CALLS)]))
+
+    assert [r.status_code for r in responses] == [200] * CALLS, {r.status_code for r in responses}
+    ids = {(r.json()["dept"]["dept_id"], r.json()["sub_dept"]["sub_dept_id"],
+            r.json()["designation"]["designation_id"]) for r in responses}
+    assert len(ids) == 1
+    assert _count(Department, "dept_key", [body["dept_name"]]) == 1
+    assert _count(SubDepartment, "sub_dept_key", [body["sub_dept_name"]]) == 1
+    assert _count(Designation, "designation_key", [body["designation_name"]]) == 1
+
+
+def test_parallel_single_creates_same_names():
+    tag = uuid.uuid4().hex[:8]
+
+    def fire(path, body, id_col):
+        responses = asyncio.run(_fire([(path, body)] * CALLS))
+        assert [r.status_code for r in responses] == [200] * CALLS, {r.status_code for r in responses}
+        ids = {r.json()[id_col] for r in responses}
+        assert len(ids) == 1
+        return ids.pop()
+
+    dept_id = fire("/org/departments", {"dept_name": f"Ops {tag}"}, "dept_id")
+    sub_dept_id = fire("/org/sub-departments", {"dept_id": dept_id, "sub_dept_name": f"Infra {tag}"}, "sub_dept_id")
+    fire(
+        "/org/designations",
+        {"designation_name": f"Lead {tag}", "dept_id": dept_id, "sub_dept_id": sub_dept_id},
+        "designation_id",
+    )
+    assert _count(Department, "dept_key", [f"Ops {tag}"]) == 1
+    assert _count(SubDepartment, "sub_dept_key", [f"Infra {tag}"]) == 1
+    assert _count(Designation, "designation_key", [f"Lead {tag}"]) == 1
+
+
+def test_parallel_bulk_add_all_overlapping_names():
+    tag = uuid.uuid4().hex[:8]
+    depts = [f"Dept{d} {tag}" for d in range(3)]
+    items = [
+        {"dept_name": dept, "sub_dept_name": f"Team{t} {tag}", "designation_name": f"Role{r} {tag}"}
+        for dept in depts for t in range(4) for r in range(5)
+    ]
+    # every call overlaps every other; each uses a rotated order so inserts interleave
+    requests = [
+        ("/org/add-all/bulk", {"items": items[i % len(items):] + items[:i % len(items)]})
+        for i in range(BULK_CALLS)
+    ]
+
+    responses = asyncio.run(_fire(requests))
+
+    assert [r.status_code for r in responses] == [200] * BULK_CALLS, {r.status_code for r in responses}
+    resolved = set()
+    for r in responses:
+        resolved |= {(x["dept_id"], x["sub_dept_id"], x["designation_id"]) for x in r.json()["rows"]}
+    assert len(resolved) == len(items)
+    assert _count(Department, "dept_key", depts) == 3
+    assert _count(SubDepartment, "sub_dept_key", [f"Team{t} {tag}" for t in range(4)]) == 3 * 4
+    assert _count(Designation, "designation_key", [f"Role{r} {tag}" for r in range(5)]) == len(items)
+    created = sum(r.json()["created"]["designation"] for r in responses)
+    assert created == len(items)
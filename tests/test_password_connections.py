@@ -0,0 +1,61 @@
+# tests/test_password_connections.py
+"""Routes that await the password pool must not hold a pooled DB connection while bcrypt runs."""
+import asyncio
+import json
+import uuid
+
+import httpx
+from sqlalchemy import select
+
+import db
+from main import app
+from models import AuthUser, Role
+from utils.password_pool import password_pool
+from utils.security import create_access_token
+
+
+def _admin_token() -> str:
+    with db.SessionLocal() as s:
+        role = s.scalar(select(Role).where(Role.role_name == "ADMIN"))
+        if role is None:
+            role = Role(role_name="ADMIN")
+            s.add(role)
+            s.flush()
+        u = AuthUser(email=f"{uuid.uuid4().hex[:8]}@example.com", password_hash="x", user_role_id=role.role_id)
+        s.add(u)
+        s.commit()
+        return create_access_token(str(u.user_id), ["ADMIN"])
+
+
+def test_no_connection_held_across_bcrypt(monkeypatch):
+    held = {}
+
+    def recording(name, fn):
+        async def wrapper(*args, **kw):
+            held[name] = db.engine.pool.checkedout()
+            return await fn(*args, **kw)
+        monkeypatch.setattr(password_pool, name, wrapper)
+
+    for name in ("hash", "verify", "hash_many"):
+        recording(name, getattr(password_pool, name))
+
+    tag = uuid.uuid4().hex[:8]
+    admin = {"authorization": "Bearer " + _admin_token()}
+    row = {"email": f"imp-{tag}@example.com", "password": "pw", "employee_id": f"I-{tag}", "full_name": "Imp"}
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            creds = {"email": f"reg-{tag}@example.com", "password": "pw"}
+            assert (await client.post("/auth/register", json=creds)).status_code == 200
+            assert (await client.post("/auth/login", json=creds)).status_code == 200
+            r = await client.post("/auth/users", headers=admin, json={
+                "email": f"new-{tag}@example.com", "password": "pw", "employee_id": f"E-{tag}", "full_name": "New",
+            })
+            assert r.status_code == 200, r.text
+            r = await client.post("/auth/users/import", headers=admin, content=json.dumps(row))
+            assert r.json()["summary"] == {"created": 1}, r.text
+
+    asyncio.run(go())
+
+    assert held == {"hash": 0, "verify": 0, "hash_many": 0}
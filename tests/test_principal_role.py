@@ -0,0 +1,50 @@
+# tests/test_principal_role.py
+"""A principal's role comes from its own SELECT, not from a role registry that may not be loaded yet."""
+import asyncio
+import time
+import uuid
+
+import httpx
+from sqlalchemy import select
+
+from db import SessionLocal
+from main import app
+from models import AuthUser, Role
+from utils.principal_cache import principal_cache
+from utils.role_registry import role_registry
+from utils.security import create_access_token
+
+
+def _admin_user() -> int:
+    with SessionLocal() as db:
+        role = db.scalar(select(Role).where(Role.role_name == "ADMIN"))
+        if role is None:
+            role = Role(role_name="ADMIN")
+            db.add(role)
+            db.flush()
+        u = AuthUser(email=f"{uuid.uuid4().hex[:8]}@example.com", password_hash="x", user_role_id=role.role_id)
+        db.add(u)
+        db.commit()
+        return u.user_id
+
+
+async def _get(path, uid):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers={"authorization": "Bearer " + create_access_token(str(uid), ["ADMIN"])})
+
+
+def test_role_gate_with_unloaded_registry(monkeypatch):
+    uid = _admin_user()
+    # as after a boot with the DB down: nothing loaded, and a miss reload was just attempted
+    monkeypatch.setattr(role_registry, "_by_id", {})
+    monkeypatch.setattr(role_registry, "_by_name", {})
+    monkeypatch.setattr(role_registry, "_loaded", False)
+    monkeypatch.setattr(role_registry, "_miss_reload_at", time.monotonic())
+    principal_cache.pop(uid)
+
+    r = asyncio.run(_get(f"/auth/users/{uid}", uid))
+
+    assert r.status_code == 200, r.text
+    assert r.json()["role"] == "ADMIN"
+    assert principal_cache.get(uid).role == "ADMIN"
@@ -0,0 +1,26 @@
+# tests/test_user_filter_plans.py
+"""Query-plan regression: the pushed-down /auth/users filters must seek an index, not scan."""
+import pytest
+
+from utils.user_export import export_query
+from utils.user_queries import UserFilters
+
+
+def _plan(engine, filters: UserFilters) -> list:
+    compiled = export_query(filters).compile(dialect=engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).all()
+    return [r[-1] for r in rows]
+
+
+@pytest.mark.parametrize("filters, index", [
+    (UserFilters(dept_id=1), "ix_employee_org"),
+    (UserFilters(sub_dept_id=1), "ix_employee_sub_dept"),
+    (UserFilters(designation_id=1), "ix_employee_designation"),
+    (UserFilters(card_id="C-1"), "ix_employee_card"),
+])
+def test_filter_uses_index_search(engine, filters, index):
+    plan = _plan(engine, filters)
+    assert not [step for step in plan if step.startswith("SCAN")], plan
+    assert any(step.startswith("SEARCH dbo.employee_list USING INDEX " + index) for step in plan), plan
@@ -0,0 +1,39 @@
+# tests/test_user_patch.py
+"""PATCH /auth/users/{id} only assigns existing roles; a typo must not create one."""
+import asyncio
+
+import httpx
+from sqlalchemy import select
+
+from db import SessionLocal
+from main import app
+from models import Role
+from utils.role_registry import role_registry
+from utils.security import create_access_token
+
+
+def _patch(admin_id, user_id, body):
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            headers = {"authorization": "Bearer " + create_access_token(str(admin_id), ["ADMIN"])}
+            return await client.patch(f"/auth/users/{user_id}", headers=headers, json=body)
+    return asyncio.run(go())
+
+
+def test_unknown_role_is_rejected(admin_id):
+    r = _patch(admin_id, admin_id, {"role": "brandnewrole"})
+
+    assert r.status_code == 400, r.text
+    assert r.json()["detail"] == {"message": "Unknown roles", "roles": ["BRANDNEWROLE"]}
+    with SessionLocal() as db:
+        assert db.scalar(select(Role).where(Role.role_name == "BRANDNEWROLE")) is None
+
+
+def test_existing_role_is_assigned(admin_id):
+    role_registry.ensure("AUDITOR")
+
+    r = _patch(admin_id, admin_id, {"role": "auditor"})
+
+    assert r.status_code == 200, r.text
+    assert r.json()["role"] == "AUDITOR"
@@ -0,0 +1,14 @@
+# utils/chunking.py
+from __future__ import annotations
+
+from typing import Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+IN_CHUNK = 1000  # keep IN lists well under MSSQL's 2100-parameter limit
+
+
+def in_chunks(values: Iterable[T], n: int = IN_CHUNK) -> List[List[T]]:
+    """Split `values` into lists of at most `n`, for chunked IN (...) queries."""
+    values = list(values)
+    return [values[i:i + n] for i in range(0, len(values), n)]
@@ -0,0 +1,187 @@
+# utils/directory_index.py
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from config import settings
+from db import SessionLocal
+from models import AuthUser, Employee
+
+DOC_FIELDS = ("user_id", "email", "full_name", "employee_id", "card_id", "is_active")
+
+
+def _terms(doc: dict) -> set:
+    """Lower-cased searchable terms: name words, full email + local part, employee/card ids."""
+    out = set()
+    if doc.get("full_name"):
+        out.update(doc["full_name"].lower().split())
+    if doc.get("email"):
+        email = doc["email"].lower()
+        out.add(email)
+        out.add(email.split("@", 1)[0])
+    for k in ("employee_id", "card_id"):
+        if doc.get(k):
+            out.add(str(doc[k]).lower())
+    return out
+
+
+class DirectoryIndex:
+    """
+    Prefix index for people-picker typeahead.
+
+    Postings are a sorted list of (term, user_id) kept as two parallel lists; a
+    prefix lookup is one bisect plus a forward scan. Built from one SELECT at
+    startup (and every DIRECTORY_REBUILD_INTERVAL seconds, to pick up writes made
+    by other workers), and updated in place by this process's write paths.
+    """
+
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+        self._lock = threading.RLock()
+        self._docs: Dict[int, dict] = {}
+        self._keys: List[str] = []
+        self._uids: List[int] = []
+        self.ready = False
+        self.build_ms = 0.0
+        self.built_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- build ----------
+    def rebuild(self) -> int:
+        started = time.perf_counter()
+        with self._session_factory() as db:
+            rows = db.execute(
+                select(
+                    AuthUser.user_id, AuthUser.email, AuthUser.is_active,
+                    Employee.full_name, Employee.employee_id, Employee.card_id,
+                ).outerjoin(Employee, Employee.user_id == AuthUser.user_id)
+            ).all()
+        docs = {r.user_id: {k: getattr(r, k) for k in DOC_FIELDS} for r in rows}
+        pairs = sorted((t, uid) for uid, d in docs.items() for t in _terms(d))
+        with self._lock:
+            self._docs = docs
+            self._keys = [t for t, _ in pairs]
+            self._uids = [u for _, u in pairs]
+            self.ready = True
+            self.built_at = time.time()
+            self.build_ms = (time.perf_counter() - started) * 1000
+        return len(docs)
+
+    def start(self) -> None:
+        """Build in the background, then refresh periodically."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="directory-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.rebuild()
+            except Exception as e:
+                print("⚠️ Directory index build failed:", e)
+            self._stop.wait(settings.DIRECTORY_REBUILD_INTERVAL if self.ready else 30)
+
+    # ---------- incremental ----------
+    def _remove_terms(self, uid: int, terms: Iterable[str]) -> None:
+        for t in terms:
+            i = bisect_left(self._keys, t)
+            while i < len(self._keys) and self._keys[i] == t:
+                if self._uids[i] == uid:
+                    del self._keys[i], self._uids[i]
+                    break
+                i += 1
+
+    def upsert(self, doc: dict) -> None:
+        uid = doc["user_id"]
+        doc = {k: doc.get(k) for k in DOC_FIELDS}
+        with self._lock:
+            old = self._docs.get(uid)
+            old_terms = _terms(old) if old else set()
+            new_terms = _terms(doc)
+            self._remove_terms(uid, old_terms - new_terms)
+            for t in new_terms - old_terms:
+                i = bisect_left(self._keys, t)
+                self._keys.insert(i, t)
+                self._uids.insert(i, uid)
+            self._docs[uid] = doc
+
+    def upsert_user(self, u: AuthUser) -> None:
+        e = u.Employee
+        self.upsert({
+            "user_id": u.user_id,
+            "email": u.email,
+            "is_active": u.is_active,
+            "full_name": e.full_name if e else None,
+            "employee_id": e.employee_id if e else None,
+            "card_id": e.card_id if e else None,
+        })
+
+    # ---------- query ----------
+    def search(self, q: str, limit: int = 10, include_inactive: bool = False) -> List[dict]:
+        """
+        Walk the postings of the longest query token in term order (so exact and
+        shorter terms come first) and check the remaining tokens against each
+        candidate's own terms. Stops after `limit` hits or DIRECTORY_SCAN_CAP postings.
+        """
+        tokens = sorted(set(q.lower().split()), key=len, reverse=True)
+        if not tokens:
+            return []
+        lead, rest = tokens[0], tokens[1:]
+        out: List[dict] = []
+        seen = set()
+        with self._lock:
+            keys, uids = self._keys, self._uids
+            i = bisect_left(keys, lead)
+            end = min(len(keys), i + settings.DIRECTORY_SCAN_CAP)
+            while i < end and keys[i].startswith(lead):
+                uid = uids[i]
+                i += 1
+                if uid in seen:
+                    continue
+                seen.add(uid)
+                d = self._docs[uid]
+                if not include_inactive and not d["is_active"]:
+                    continue
+                if rest:
+                    terms = _terms(d)
+                    if not all(any(t.startswith(r) for t in terms) for r in rest):
+                        continue
+                out.append(d)
+                if len(out) >= limit:
+                    break
+        return out
+
+    # ---------- metrics ----------
+    def memory_bytes(self) -> int:
+        """Approximate footprint: postings lists, term strings and document dicts."""
+        with self._lock:
+            size = sys.getsizeof(self._keys) + sys.getsizeof(self._uids) + sys.getsizeof(self._docs)
+            size += sum(sys.getsizeof(k) for k in set(self._keys))
+            for d in self._docs.values():
+                size += sys.getsizeof(d) + sum(sys.getsizeof(v) for v in d.values() if isinstance(v, str))
+        return size
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "documents": len(self._docs),
+            "postings": len(self._keys),
+            "memory_bytes": self.memory_bytes(),
+            "build_ms": round(self.build_ms, 3),
+            "built_at": self.built_at,
+        }
+
+
+directory_index = DirectoryIndex(SessionLocal)
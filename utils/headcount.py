@@ -0,0 +1,171 @@
+# utils/headcount.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from config import settings
+from db import SessionLocal
+from models import AuthUser, Employee
+from utils.chunking import in_chunks
+from utils.response_cache import encode_json
+
+# (dept_id, sub_dept_id, designation_id, is_active) of one employee
+Placement = Tuple[Optional[int], Optional[int], Optional[int], bool]
+
+KINDS = ("department", "sub_department", "designation")
+
+
+def placement_of(u: AuthUser) -> Optional[Placement]:
+    e = u.Employee
+    if e is None:
+        return None
+    return e.dept_id, e.sub_dept_id, e.designation_id, bool(u.is_active)
+
+
+def placements(db: Session, user_ids: Iterable) -> Dict[int, Placement]:
+    """Current placements for the given ids (non-integers are ignored), chunked IN queries."""
+    ids = []
+    for v in user_ids:
+        try:
+            ids.append(int(v))
+        except (TypeError, ValueError):
+            pass
+    ids = sorted(set(ids))
+    out: Dict[int, Placement] = {}
+    for chunk in in_chunks(ids):
+        rows = db.execute(
+            select(Employee.user_id, Employee.dept_id, Employee.sub_dept_id, Employee.designation_id,
+                   AuthUser.is_active)
+            .join(AuthUser, AuthUser.user_id == Employee.user_id)
+            .where(Employee.user_id.in_(chunk))
+        ).all()
+        for r in rows:
+            out[r.user_id] = (r.dept_id, r.sub_dept_id, r.designation_id, bool(r.is_active))
+    return out
+
+
+class HeadcountCounters:
+    """
+    Active/inactive headcount per department, sub-department and designation.
+
+    recount() rebuilds everything from one GROUP BY over employee_list JOIN users;
+    write paths call move(old, new) with an employee's placement before and after
+    the commit. A daemon thread recounts every HEADCOUNT_RECOUNT_INTERVAL seconds,
+    which also reconciles writes made by other workers. Node reads are dict lookups.
+    """
+
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[int, List[int]]] = {k: {} for k in KINDS}  # id -> [active, inactive]
+        self._total = [0, 0]
+        self._encoded: Optional[Tuple[int, bytes, str]] = None
+        self.version = 0
+        self.ready = False
+        self.recount_ms = 0.0
+        self.recounted_at: Optional[float] = None
+        self.moves = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- full recount ----------
+    def recount(self) -> int:
+        started = time.perf_counter()
+        with self._session_factory() as db:
+            rows = db.execute(
+                select(Employee.dept_id, Employee.sub_dept_id, Employee.designation_id, AuthUser.is_active,
+                       func.count().label("n"))
+                .join(AuthUser, AuthUser.user_id == Employee.user_id)
+                .group_by(Employee.dept_id, Employee.sub_dept_id, Employee.designation_id, AuthUser.is_active)
+            ).all()
+        counts: Dict[str, Dict[int, List[int]]] = {k: {} for k in KINDS}
+        total = [0, 0]
+        for r in rows:
+            slot = 0 if r.is_active else 1
+            total[slot] += r.n
+            for kind, node in zip(KINDS, (r.dept_id, r.sub_dept_id, r.designation_id)):
+                if node is not None:
+                    counts[kind].setdefault(node, [0, 0])[slot] += r.n
+        with self._lock:
+            self._counts, self._total = counts, total
+            self.version += 1
+            self.ready = True
+            self.recounted_at = time.time()
+            self.recount_ms = (time.perf_counter() - started) * 1000
+        return len(rows)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="headcount", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.recount()
+            except Exception as e:
+                print("⚠️ Headcount recount failed:", e)
+            self._stop.wait(settings.HEADCOUNT_RECOUNT_INTERVAL if self.ready else 30)
+
+    # ---------- incremental ----------
+    def _apply(self, p: Placement, delta: int) -> None:
+        slot = 0 if p[3] else 1
+        self._total[slot] += delta
+        for kind, node in zip(KINDS, p[:3]):
+            if node is not None:
+                self._counts[kind].setdefault(node, [0, 0])[slot] += delta
+
+    def move(self, old: Optional[Placement], new: Optional[Placement]) -> None:
+        """Record one committed change (None = not an employee before/after)."""
+        if old == new or not self.ready:
+            return
+        with self._lock:
+            if old is not None:
+                self._apply(old, -1)
+            if new is not None:
+                self._apply(new, +1)
+            self.version += 1
+            self.moves += 1
+
+    # ---------- reads ----------
+    @staticmethod
+    def _shape(c: List[int]) -> dict:
+        return {"active": c[0], "inactive": c[1], "total": c[0] + c[1]}
+
+    def node(self, kind: str, ident: int) -> dict:
+        return self._shape(self._counts[kind].get(ident, [0, 0]))
+
+    def encoded(self) -> Tuple[bytes, str]:
+        """Whole table as pre-encoded JSON; re-encoded only when the version changed."""
+        with self._lock:
+            if self._encoded is None or self._encoded[0] != self.version:
+                body, etag = encode_json({
+                    "version": self.version,
+                    "total": self._shape(self._total),
+                    **{k + "s": {i: self._shape(c) for i, c in self._counts[k].items()} for k in KINDS},
+                })
+                self._encoded = (self.version, body, etag)
+            return self._encoded[1], self._encoded[2]
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "version": self.version,
+            "nodes": sum(len(v) for v in self._counts.values()),
+            "moves": self.moves,
+            "recount_ms": round(self.recount_ms, 3),
+            "recounted_at": self.recounted_at,
+        }
+
+
+headcount = HeadcountCounters(SessionLocal)
@@ -0,0 +1,183 @@
+# utils/migrations.py
+from __future__ import annotations
+
+from sqlalchemy import select, text, update
+from sqlalchemy.orm import Session
+
+from models import Base, Employee, RefreshToken, Department, SubDepartment, Designation
+from models.org import name_key
+from utils.photo_store import REF_PREFIX, photo_store, decode_inline
+
+
+def _column_type(db: Session, table: str, column: str) -> str | None:
+    row = db.execute(
+        text(
+            "SELECT TYPE_NAME(system_type_id) AS type_name FROM sys.columns "
+            "WHERE object_id = OBJECT_ID(:t) AND name = :c"
+        ),
+        {"t": table, "c": column},
+    ).fetchone()
+    return row.type_name if row else None
+
+
+def _drop_indexes_on(db: Session, table: str, column: str) -> None:
+    rows = db.execute(
+        text(
+            "SELECT DISTINCT i.name FROM sys.indexes i "
+            "JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id "
+            "JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id "
+            "WHERE i.object_id = OBJECT_ID(:t) AND c.name = :c AND i.is_primary_key = 0"
+        ),
+        {"t": table, "c": column},
+    ).fetchall()
+    for r in rows:
+        db.execute(text(f"DROP INDEX [{r.name}] ON {table}"))
+
+
+def migrate_refresh_tokens_binary(db: Session) -> bool:
+    """
+    One-off, idempotent (MSSQL):
+      - token_hash VARCHAR(64) hex  ->  BINARY(32)
+      - replace the single-column index with the model's covering indexes
+    Returns True if anything was converted.
+    """
+    table = "dbo.refresh_tokens"
+    if _column_type(db, table, "token_hash") == "binary":
+        return False
+
+    _drop_indexes_on(db, table, "token_hash")
+    db.execute(text(f"ALTER TABLE {table} ADD token_hash_bin BINARY(32) NULL"))
+    db.commit()
+
+    # style 2 = hex string without the 0x prefix
+    db.execute(text(f"UPDATE {table} SET token_hash_bin = TRY_CONVERT(BINARY(32), token_hash, 2)"))
+    db.execute(text(f"DELETE FROM {table} WHERE token_hash_bin IS NULL"))
+    db.execute(text(f"ALTER TABLE {table} DROP COLUMN token_hash"))
+    db.execute(text(f"EXEC sp_rename '{table}.token_hash_bin', 'token_hash', 'COLUMN'"))
+    db.commit()
+
+    db.execute(text(f"ALTER TABLE {table} ALTER COLUMN token_hash BINARY(32) NOT NULL"))
+    conn = db.connection()
+    for ix in RefreshToken.__table__.indexes:
+        ix.create(conn, checkfirst=True)
+    db.commit()
+    return True
+
+
+def create_missing_indexes(db: Session) -> None:
+    """Create any index declared on the models that the database does not have yet."""
+    conn = db.connection()
+    for table in Base.metadata.sorted_tables:
+        for ix in table.indexes:
+            ix.create(conn, checkfirst=True)
+    db.commit()
+
+
+def migrate_inline_photos(db: Session, batch: int = 200) -> dict:
+    """
+    Move inline base64 profile photos into the blob store, `batch` rows per
+    transaction (keyset on user_id), leaving "sha256:<hex>" in the row.
+    Idempotent: rows that already hold a reference are skipped; values that
+    do not decode are left in place and counted as "invalid".
+    """
+    counts = {"moved": 0, "invalid": 0}
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Employee.user_id, Employee.profile_photo)
+            .where(
+                Employee.user_id > last_id,
+                Employee.profile_photo.is_not(None),
+                Employee.profile_photo.not_like(REF_PREFIX + "%"),
+            )
+            .order_by(Employee.user_id)
+            .limit(batch)
+        ).all()
+        if not rows:
+            return counts
+
+        updates = []
+        for r in rows:
+            data = decode_inline(r.profile_photo)
+            if not data:
+                counts["invalid"] += 1
+                continue
+            digest = photo_store.save_bytes(data)
+            photo_store.make_thumbnail_sync(digest)
+            updates.append({"user_id": r.user_id, "profile_photo": REF_PREFIX + digest})
+            counts["moved"] += 1
+        if updates:
+            db.execute(update(Employee), updates)
+            db.commit()
+        last_id = rows[-1].user_id
+
+
+ORG_KEY_COLUMNS = (
+    # model, id column, name column, key column, constraint the key index replaces
+    (Department, "dept_id", "dept_name", "dept_key", None),
+    (SubDepartment, "sub_dept_id", "sub_dept_name", "sub_dept_key", "uq_subdept_per_dept"),
+    (Designation, "designation_id", "designation_name", "designation_key", "uq_desig_per_scope"),
+)
+
+
+def migrate_org_name_keys(db: Session, batch: int = 1000) -> dict:
+    """
+    One-off, idempotent (MSSQL): add the persisted name-key columns to the org
+    tables, backfill them in keyset batches with models.org.name_key, then swap
+    the old name-based unique constraints for the key indexes.
+    Raises RuntimeError (before any index is created) if existing names collide
+    once normalised; rename those rows and run again.
+    Returns {table: rows backfilled}.
+    """
+    done = {}
+    for model, id_col, name_col, key_col, _ in ORG_KEY_COLUMNS:
+        table = f"dbo.{model.__tablename__}"
+        if _column_type(db, table, key_col) is not None:
+            done[table] = 0
+            continue
+        db.execute(text(f"ALTER TABLE {table} ADD {key_col} VARCHAR(150) NULL"))
+        db.commit()
+
+        last_id, n = 0, 0
+        while True:
+            rows = db.execute(
+                text(f"SELECT TOP (:n) {id_col} AS id, {name_col} AS name FROM {table} "
+                     f"WHERE {id_col} > :last ORDER BY {id_col}"),
+                {"n": batch, "last": last_id},
+            ).fetchall()
+            if not rows:
+                break
+            db.execute(
+                text(f"UPDATE {table} SET {key_col} = :k WHERE {id_col} = :id"),
+                [{"k": name_key(r.name), "id": r.id} for r in rows],
+            )
+            db.commit()
+            last_id, n = rows[-1].id, n + len(rows)
+        db.execute(text(f"ALTER TABLE {table} ALTER COLUMN {key_col} VARCHAR(150) NOT NULL"))
+        db.commit()
+        done[table] = n
+
+    clashes = []
+    for model, *_ in ORG_KEY_COLUMNS:
+        for ix in model.__table__.indexes:
+            cols = ", ".join(c.name for c in ix.columns)
+            clashes += [
+                (model.__tablename__, tuple(r))
+                for r in db.execute(text(
+                    f"SELECT {cols} FROM dbo.{model.__tablename__} GROUP BY {cols} HAVING COUNT(*) > 1"
+                )).fetchall()
+            ]
+    if clashes:
+        raise RuntimeError(f"Org names collide after normalisation: {clashes[:20]}")
+
+    conn = db.connection()
+    for model, _, _, _, old in ORG_KEY_COLUMNS:
+        table = f"dbo.{model.__tablename__}"
+        if old:
+            db.execute(text(
+                f"IF OBJECT_ID('dbo.{old}', 'UQ') IS NOT NULL ALTER TABLE {table} DROP CONSTRAINT {old}"
+            ))
+        for ix in model.__table__.indexes:
+            ix.create(conn, checkfirst=True)
+    db.commit()
+    return done
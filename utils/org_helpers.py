@@ -1,27 +1,85 @@
 from __future__ import annotations
-from typing import Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from fastapi import HTTPException
-from sqlalchemy import select, func
+from sqlalchemy import select, insert, exists, literal, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from models import Department, SubDepartment, Designation
+from models.org import norm_name as _norm, name_key
+from utils.chunking import in_chunks
 
 
-def _norm(s: str) -> str:
-    """Normalize names for idempotency (trim & collapse spaces; case-insensitive checks)."""
-    return " ".join(s.strip().split())
+# -----------------------------
+# Single-statement get-or-create
+# -----------------------------
+UPSERT_RETRIES = 3
+
+
+def _scope(model, keys: Dict[str, object]) -> list:
+    """Equality on every key column, NULL-safe (designation scope columns are nullable)."""
+    return [getattr(model, k).is_(None) if v is None else getattr(model, k) == v for k, v in keys.items()]
+
+
+def _merge_mssql(db: Session, model, keys: Dict[str, object], values: Dict[str, object]):
+    """
+    MERGE ... WITH (HOLDLOCK): the range lock on the key index serialises
+    concurrent callers, and the no-op UPDATE makes OUTPUT return the row on a
+    hit too, so both paths are one round-trip.
+    """
+    cols = list(keys) + list(values)
+    on = " AND ".join(
+        f"(t.{k} = s.{k} OR (t.{k} IS NULL AND s.{k} IS NULL))" if getattr(model, k).nullable else f"t.{k} = s.{k}"
+        for k in keys
+    )
+    first = next(iter(keys))
+    stmt = text(
+        f"MERGE {model.__table__.fullname} WITH (HOLDLOCK) AS t "
+        f"USING (SELECT {', '.join(f':{c} AS {c}' for c in cols)}) AS s ON {on} "
+        f"WHEN MATCHED THEN UPDATE SET t.{first} = t.{first} "
+        f"WHEN NOT MATCHED THEN INSERT ({', '.join(cols)}) VALUES ({', '.join('s.' + c for c in cols)}) "
+        f"OUTPUT inserted.*;"
+    )
+    return db.scalars(select(model).from_statement(stmt), {**keys, **values}).one()
+
+
+def _insert_if_absent(db: Session, model, keys: Dict[str, object], values: Dict[str, object]):
+    """Portable path: INSERT ... SELECT ... WHERE NOT EXISTS RETURNING; on a hit, read the row."""
+    row = {**keys, **values}
+    src = select(
+        *(literal(v, type_=getattr(model, c).type).label(c) for c, v in row.items())
+    ).where(~exists().where(*_scope(model, keys)))
+    created = db.scalars(insert(model).from_select(list(row), src).returning(model)).one_or_none()
+    if created is not None:
+        return created
+    return db.scalars(select(model).where(*_scope(model, keys))).one()
+
+
+def _get_or_insert(db: Session, model, keys: Dict[str, object], values: Dict[str, object]):
+    """
+    Fetch the row matching `keys` or insert it, in one statement on MSSQL.
+    A unique violation means another request won the race; the failed statement
+    is rolled back on its own (statement-level atomicity), so simply try again.
+    """
+    fn = _merge_mssql if db.get_bind().dialect.name == "mssql" else _insert_if_absent
+    values = {**values, "created_at": datetime.utcnow()}
+    for attempt in range(UPSERT_RETRIES):
+        try:
+            return fn(db, model, keys, values)
+        except IntegrityError:
+            if attempt == UPSERT_RETRIES - 1:
+                raise HTTPException(status_code=409, detail="Concurrent update, retry")
 
 
 def get_or_create_department(
         db: Session, name: str, description: Optional[str], created_by: Optional[int]
 ) -> Department:
     norm = _norm(name)
-    existing = db.scalar(select(Department).where(func.lower(Department.dept_name) == norm.lower()))
-    if existing:
-        return existing
-    d = Department(dept_name=norm, description=description, created_by=created_by)
-    db.add(d)
-    db.flush()
-    return d
+    return _get_or_insert(
+        db, Department,
+        {"dept_key": name_key(norm)},
+        {"dept_name": norm, "description": description, "created_by": created_by},
+    )
 
 
 def get_or_create_subdept(
@@ -32,19 +90,11 @@ def get_or_create_subdept(
     if not dept:
         raise HTTPException(status_code=404, detail="Department not found")
 
-    existing = db.scalar(
-        select(SubDepartment).where(
-            SubDepartment.dept_id == dept_id,
-            func.lower(SubDepartment.sub_dept_name) == norm.lower(),
-        )
+    return _get_or_insert(
+        db, SubDepartment,
+        {"dept_id": dept_id, "sub_dept_key": name_key(norm)},
+        {"sub_dept_name": norm, "description": description, "created_by": created_by},
     )
-    if existing:
-        return existing
-
-    sd = SubDepartment(dept_id=dept_id, sub_dept_name=norm, description=description, created_by=created_by)
-    db.add(sd)
-    db.flush()
-    return sd
 
 
 def get_or_create_designation(
@@ -63,23 +113,139 @@ def get_or_create_designation(
         raise HTTPException(status_code=404, detail="Sub-Department not found for designation")
 
     # Uniqueness scoped by (name, dept_id, sub_dept_id)
-    existing = db.scalar(
-        select(Designation).where(
-            func.lower(Designation.designation_name) == norm.lower(),
-            (Designation.dept_id == dept_id) if dept_id is not None else Designation.dept_id.is_(None),
-            (Designation.sub_dept_id == sub_dept_id) if sub_dept_id is not None else Designation.sub_dept_id.is_(None),
-        )
-    )
-    if existing:
-        return existing
-
-    desig = Designation(
-        designation_name=norm,
-        dept_id=dept_id,
-        sub_dept_id=sub_dept_id,
-        description=description,
-        created_by=created_by,
+    return _get_or_insert(
+        db, Designation,
+        {"designation_key": name_key(norm), "dept_id": dept_id, "sub_dept_id": sub_dept_id},
+        {"designation_name": norm, "description": description, "created_by": created_by},
     )
-    db.add(desig)
-    db.flush()
-    return desig
+
+
+# -----------------------------
+# Bulk add-all (set-based)
+# -----------------------------
+def _row_key(row, key_cols: Tuple[str, ...]):
+    return getattr(row, key_cols[0]) if len(key_cols) == 1 else tuple(getattr(row, c) for c in key_cols)
+
+
+def _lookup(db: Session, model, id_col: str, key_cols: Tuple[str, ...], keys, found: dict) -> None:
+    """
+    Add to `found` (key -> id) the rows that exist for `keys`. The last key column is
+    the name key, chunked into IN lists; scope columns are narrowed with IN and the
+    exact combination is checked here.
+    """
+    keys = set(keys)
+    name_col = key_cols[-1]
+    names = {k[-1] for k in keys} if len(key_cols) > 1 else keys
+    scope = [getattr(model, c).in_({k[i] for k in keys}) for i, c in enumerate(key_cols[:-1])]
+    cols = [getattr(model, id_col), *(getattr(model, c) for c in key_cols)]
+    for chunk in in_chunks(names):
+        for r in db.execute(select(*cols).where(getattr(model, name_col).in_(chunk), *scope)):
+            k = _row_key(r, key_cols)
+            if k in keys:
+                found[k] = getattr(r, id_col)
+
+
+def _insert_absent(db: Session, model, id_col: str, key_cols: Tuple[str, ...], new: dict, found: dict) -> List[int]:
+    """
+    One executemany INSERT ... RETURNING for `new` (key -> values), matched back by key
+    into `found`. Another upload may insert some of the same keys between our SELECT
+    and INSERT: the unique violation rolls back only this savepoint, so re-read those
+    keys and retry the rest. Returns the ids created here.
+    """
+    cols = [getattr(model, id_col), *(getattr(model, c) for c in key_cols)]
+    for attempt in range(UPSERT_RETRIES):
+        if not new:
+            return []
+        try:
+            with db.begin_nested():
+                rows = db.execute(insert(model).returning(*cols), list(new.values())).all()
+        except IntegrityError:
+            if attempt == UPSERT_RETRIES - 1:
+                raise HTTPException(status_code=409, detail="Concurrent update, retry")
+            _lookup(db, model, id_col, key_cols, new, found)
+            new = {k: v for k, v in new.items() if k not in found}
+            continue
+        for r in rows:
+            found[_row_key(r, key_cols)] = getattr(r, id_col)
+        return [getattr(r, id_col) for r in rows]
+    return []
+
+
+def bulk_get_or_create(db: Session, items: list) -> Tuple[List[dict], Dict[str, List[int]]]:
+    """
+    Resolve many (department, sub-department, designation) triples at once.
+
+    Per level: one SELECT (per IN chunk) for what already exists, then one
+    executemany INSERT ... RETURNING for what does not (rows are matched back
+    by their key columns, so no parameter-order sentinel is needed; conflicts
+    with a concurrent upload are re-read and retried, see _insert_absent).
+    Names are compared on their persisted keys (models.org.name_key; for a
+    _norm'd name that is just .lower()) and the first spelling seen is stored.
+    The caller owns the transaction.
+    Returns (rows, created) with rows[i] = {"row", "dept_id", "sub_dept_id", "designation_id"}.
+    """
+    rows = []
+    bad = []
+    for i, it in enumerate(items):
+        names = (_norm(it.dept_name), _norm(it.sub_dept_name), _norm(it.designation_name))
+        if not all(names):
+            bad.append(i + 1)
+        rows.append(names)
+    if bad:
+        raise HTTPException(status_code=400, detail=f"Empty name in rows: {bad[:20]}")
+
+    created: Dict[str, List[int]] = {}
+
+    # ---- departments ----
+    dept_ids: Dict[str, int] = {}
+    _lookup(db, Department, "dept_id", ("dept_key",), {d.lower() for d, _, _ in rows}, dept_ids)
+    new = {}
+    for it, (d, _, _) in zip(items, rows):
+        if d.lower() not in dept_ids and d.lower() not in new:
+            new[d.lower()] = {"dept_name": d, "description": it.dept_description, "created_by": it.created_by}
+    created["department"] = _insert_absent(db, Department, "dept_id", ("dept_key",), new, dept_ids)
+
+    # ---- sub-departments (scoped by dept) ----
+    sub_key = ("dept_id", "sub_dept_key")
+    sub_ids: Dict[Tuple[int, str], int] = {}
+    _lookup(db, SubDepartment, "sub_dept_id", sub_key, {(dept_ids[d.lower()], s.lower()) for d, s, _ in rows}, sub_ids)
+    new = {}
+    for it, (d, s, _) in zip(items, rows):
+        key = (dept_ids[d.lower()], s.lower())
+        if key not in sub_ids and key not in new:
+            new[key] = {
+                "dept_id": key[0], "sub_dept_name": s,
+                "description": it.sub_dept_description, "created_by": it.created_by,
+            }
+    created["sub_department"] = _insert_absent(db, SubDepartment, "sub_dept_id", sub_key, new, sub_ids)
+
+    # ---- designations (scoped by dept + sub-dept) ----
+    desig_key = ("dept_id", "sub_dept_id", "designation_key")
+    desig_ids: Dict[Tuple[int, int, str], int] = {}
+    scope = {}
+    for d, s, g in rows:
+        dept_id = dept_ids[d.lower()]
+        scope[(dept_id, sub_ids[(dept_id, s.lower())], g.lower())] = None
+    _lookup(db, Designation, "designation_id", desig_key, scope, desig_ids)
+    new = {}
+    for it, (d, s, g) in zip(items, rows):
+        dept_id = dept_ids[d.lower()]
+        key = (dept_id, sub_ids[(dept_id, s.lower())], g.lower())
+        if key not in desig_ids and key not in new:
+            new[key] = {
+                "designation_name": g, "dept_id": key[0], "sub_dept_id": key[1],
+                "description": it.designation_description, "created_by": it.created_by,
+            }
+    created["designation"] = _insert_absent(db, Designation, "designation_id", desig_key, new, desig_ids)
+
+    out = []
+    for i, (d, s, g) in enumerate(rows):
+        dept_id = dept_ids[d.lower()]
+        sub_dept_id = sub_ids[(dept_id, s.lower())]
+        out.append({
+            "row": i + 1,
+            "dept_id": dept_id,
+            "sub_dept_id": sub_dept_id,
+            "designation_id": desig_ids[(dept_id, sub_dept_id, g.lower())],
+        })
+    return out, created
@@ -0,0 +1,137 @@
+# utils/org_tree.py
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from config import settings
+from db import SessionLocal
+from models import Department, SubDepartment, Designation
+from utils.response_cache import encode_json
+
+DEPT_FIELDS = ("dept_id", "dept_name", "description")
+SUB_DEPT_FIELDS = ("sub_dept_id", "dept_id", "sub_dept_name", "description")
+DESIG_FIELDS = ("designation_id", "designation_name", "dept_id", "sub_dept_id", "description")
+
+
+def _row(r, fields) -> dict:
+    return {f: getattr(r, f) for f in fields}
+
+
+class _Snapshot(NamedTuple):
+    body: bytes
+    etag: str
+    ids: Dict[str, Set[int]]
+    built_at: float
+    generation: int  # value of OrgTree._generation when the SELECTs started
+
+
+class OrgTree:
+    """
+    Immutable, pre-serialized Department -> SubDepartment -> Designation snapshot.
+
+    Built from one SELECT per table. A write marks the snapshot stale only when it
+    created an id the snapshot has not seen; the next read rebuilds it.
+    ORG_TREE_MAX_AGE bounds staleness from writes made by other workers.
+
+    The snapshot is one immutable object swapped in by reference, so readers
+    (cached(), note_write) never take the lock; it only serialises rebuilds.
+    """
+
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+        self._build_lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._generations = itertools.count(1)
+        self._generation = 0  # bumped by note_write when the snapshot is missing an id
+        self.version = 0
+        self.build_ms = 0.0
+
+    def _build(self) -> None:
+        started = time.perf_counter()
+        generation = self._generation
+        with self._session_factory() as db:
+            depts = db.execute(select(*(getattr(Department, f) for f in DEPT_FIELDS))
+                               .order_by(Department.dept_name)).all()
+            subs = db.execute(select(*(getattr(SubDepartment, f) for f in SUB_DEPT_FIELDS))
+                              .order_by(SubDepartment.sub_dept_name)).all()
+            desigs = db.execute(select(*(getattr(Designation, f) for f in DESIG_FIELDS))
+                                .order_by(Designation.designation_name)).all()
+
+        dept_nodes = {d.dept_id: {**_row(d, DEPT_FIELDS), "sub_departments": [], "designations": []} for d in depts}
+        sub_nodes = {}
+        for s in subs:
+            node = {**_row(s, SUB_DEPT_FIELDS), "designations": []}
+            sub_nodes[s.sub_dept_id] = node
+            if s.dept_id in dept_nodes:
+                dept_nodes[s.dept_id]["sub_departments"].append(node)
+        unscoped = []
+        for g in desigs:
+            node = _row(g, DESIG_FIELDS)
+            if g.sub_dept_id is not None and g.sub_dept_id in sub_nodes:
+                sub_nodes[g.sub_dept_id]["designations"].append(node)
+            elif g.dept_id is not None and g.dept_id in dept_nodes:
+                dept_nodes[g.dept_id]["designations"].append(node)
+            else:
+                unscoped.append(node)
+
+        # no build counter in the body: the ETag depends on the tree alone, so an
+        # unchanged tree keeps its ETag (and clients their 304s) across rebuilds
+        body, etag = encode_json({
+            "departments": list(dept_nodes.values()),
+            "designations": unscoped,
+        })
+        ids = {
+            "department": set(dept_nodes),
+            "sub_department": set(sub_nodes),
+            "designation": {g.designation_id for g in desigs},
+        }
+        # a note_write racing the SELECTs bumped _generation, so this stays stale
+        self._snapshot = _Snapshot(body, etag, ids, time.monotonic(), generation)
+        self.version += 1
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+    def _fresh(self) -> Optional[_Snapshot]:
+        snap = self._snapshot
+        if snap is None or snap.generation != self._generation:
+            return None
+        if time.monotonic() - snap.built_at > settings.ORG_TREE_MAX_AGE:
+            return None
+        return snap
+
+    def cached(self) -> Optional[Tuple[bytes, str]]:
+        """The current snapshot, or None if get() would have to rebuild it. Never blocks."""
+        snap = self._fresh()
+        return (snap.body, snap.etag) if snap else None
+
+    def get(self) -> Tuple[bytes, str]:
+        snap = self._fresh()
+        if snap is None:
+            with self._build_lock:
+                snap = self._fresh()  # another thread may have just rebuilt it
+                if snap is None:
+                    self._build()
+                    snap = self._snapshot
+        return snap.body, snap.etag
+
+    def note_write(self, kind: str, ident: int) -> None:
+        """Call after a committed org write; stale only if `ident` is new to the snapshot."""
+        snap = self._snapshot
+        if snap is None or ident not in snap.ids.get(kind, ()):
+            self._generation = next(self._generations)
+
+    def stats(self) -> dict:
+        snap = self._snapshot
+        return {
+            "version": self.version,
+            "stale": self._fresh() is None,
+            "bytes": len(snap.body) if snap else 0,
+            "build_ms": round(self.build_ms, 3),
+        }
+
+
+org_tree = OrgTree(SessionLocal)
@@ -0,0 +1,23 @@
+# utils/pagination.py
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Tuple
+
+from fastapi import HTTPException
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for ORDER BY (created_at DESC, id DESC)."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        ts, rid = base64.urlsafe_b64decode(cursor + pad).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(ts), int(rid)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,149 @@
+# utils/password_pool.py
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from utils.chunking import in_chunks
+from utils.security import hash_password, verify_password, needs_rehash
+
+
+# ---------------------------
+# Worker functions (must be top-level so they pickle into the pool)
+# ---------------------------
+def _hash_job(raw: str) -> str:
+    return hash_password(raw)
+
+
+def _hash_many_job(raws: List[str]) -> List[str]:
+    return [hash_password(r) for r in raws]
+
+
+def _verify_job(raw: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Verify once; if the stored hash is legacy, return an upgraded one too."""
+    if not verify_password(raw, hashed):
+        return False, None
+    if needs_rehash(hashed):
+        return True, hash_password(raw)
+    return True, None
+
+
+# ---------------------------
+# Bounded password service
+# ---------------------------
+class PasswordPool:
+    """
+    Runs bcrypt off the request path in a dedicated process pool.
+
+    At most `workers + queue_depth` jobs may be in flight; beyond that callers
+    get an immediate 503 instead of queueing behind a login storm.
+    With workers=0 the jobs run on the AnyIO threadpool (dev / Windows).
+    """
+
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = max(0, workers)
+        self.queue_depth = max(0, queue_depth)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return max(1, self.workers) + self.queue_depth
+
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            ex, self._executor = self._executor, None
+        if ex is not None:
+            ex.shutdown(wait=True, cancel_futures=True)
+
+    def _acquire(self, n: int = 1) -> None:
+        with self._lock:
+            if self._in_flight + n > self.capacity:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Password service busy, retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._in_flight += n
+
+    def _release(self, n: int = 1) -> None:
+        with self._lock:
+            self._in_flight -= n
+            self._completed += n
+
+    async def _run(self, fn, *args):
+        self._acquire()
+        try:
+            if self.workers == 0:
+                return await run_in_threadpool(fn, *args)
+            self.start()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._release()
+
+    async def hash(self, raw: str) -> str:
+        return await self._run(_hash_job, raw)
+
+    async def verify(self, raw: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Return (ok, upgraded_hash_or_None)."""
+        return await self._run(_verify_job, raw, hashed)
+
+    async def hash_many(self, raws: List[str], chunk: int = 2) -> List[str]:
+        """
+        Hash a bulk batch across all workers, in input order.
+        Takes a single queue slot and keeps at most `workers` chunks submitted.
+        Chunks are tiny (a 12-round bcrypt hash takes ~0.25-0.4 s), so a login
+        queued behind an import waits for about one chunk, not a whole batch.
+        """
+        if not raws:
+            return []
+        self._acquire()
+        try:
+            chunks = in_chunks(raws, chunk)
+            if self.workers == 0:
+                return await run_in_threadpool(_hash_many_job, raws)
+            self.start()
+            loop = asyncio.get_running_loop()
+            gate = asyncio.Semaphore(self.workers)
+
+            async def one(c: List[str]) -> List[str]:
+                async with gate:
+                    return await loop.run_in_executor(self._executor, _hash_many_job, c)
+
+            done = await asyncio.gather(*(one(c) for c in chunks))
+            return [h for part in done for h in part]
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+
+password_pool = PasswordPool(settings.PASSWORD_WORKERS, settings.PASSWORD_QUEUE_DEPTH)
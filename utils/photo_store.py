@@ -0,0 +1,251 @@
+# utils/photo_store.py
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it no thumbnails are made
+    Image = None
+
+REF_PREFIX = "sha256:"
+
+_MAGIC = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def sniff(head: bytes) -> Optional[str]:
+    """Content type from magic bytes (first 12 bytes are enough)."""
+    for magic, ctype in _MAGIC:
+        if head.startswith(magic):
+            return ctype
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def is_ref(value: Optional[str]) -> bool:
+    return bool(value) and value.startswith(REF_PREFIX)
+
+
+def decode_inline(value: str) -> Optional[bytes]:
+    """Legacy inline photo (base64, optionally a data: URL) -> raw bytes."""
+    if value.startswith("data:"):
+        value = value.split(",", 1)[-1]
+    try:
+        return base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+
+# ---------------------------
+# Worker function (top-level so it pickles into the pool)
+# ---------------------------
+def _thumb_job(src: str, dst: str, size: int) -> bool:
+    with Image.open(src) as im:
+        im = im.convert("RGB")
+        im.thumbnail((size, size))
+        tmp = dst + ".tmp"
+        im.save(tmp, "JPEG", quality=85)
+    os.replace(tmp, dst)
+    return True
+
+
+class PhotoStore:
+    """
+    Content-addressed photo blobs on local disk: <root>/ab/cd/<sha256>, plus an
+    optional "<sha256>.thumb.jpg" next to it. Employee.profile_photo keeps only
+    "sha256:<hex>". Identical uploads share one file, and the digest doubles as a
+    strong ETag.
+
+    Thumbnails are made in a small process pool (PHOTO_THUMB_WORKERS; 0 = AnyIO
+    threadpool) so image decoding never runs on the event loop.
+    """
+
+    def __init__(self, root: str, max_bytes: int, thumb_size: int, workers: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.thumb_size = thumb_size
+        self.workers = max(0, workers)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._uploads = 0
+        self._deduplicated = 0
+        self._thumbnails = 0
+        self._thumb_failures = 0
+
+    # ---------- paths ----------
+    def path(self, digest: str, thumb: bool = False) -> str:
+        name = digest + (".thumb.jpg" if thumb else "")
+        return os.path.join(self.root, digest[:2], digest[2:4], name)
+
+    def _tmp_dir(self) -> str:
+        d = os.path.join(self.root, "tmp")
+        os.makedirs(d, exist_ok=True)
+        return d
+
+    def _commit_file(self, tmp_path: str, digest: str) -> None:
+        final = self.path(digest)
+        if os.path.exists(final):
+            os.unlink(tmp_path)
+            with self._lock:
+                self._deduplicated += 1
+            return
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        os.replace(tmp_path, final)
+
+    # ---------- writes ----------
+    async def save_stream(self, chunks: AsyncIterator[bytes]) -> Tuple[str, str]:
+        """
+        Spool an upload to disk while hashing it; returns (digest, content_type).
+        Raises 413 past max_bytes and 415 for anything that is not an image.
+        """
+        fd, tmp_path = await run_in_threadpool(tempfile.mkstemp, dir=self._tmp_dir())
+        f = os.fdopen(fd, "wb")
+        h = hashlib.sha256()
+        size = 0
+        head = b""
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Photo exceeds {self.max_bytes} bytes")
+                if len(head) < 12:
+                    head += chunk[:12 - len(head)]
+                h.update(chunk)
+                await run_in_threadpool(f.write, chunk)
+            f.close()
+            ctype = sniff(head)
+            if ctype is None:
+                raise HTTPException(status_code=415, detail="Photo must be JPEG, PNG, GIF or WebP")
+            digest = h.hexdigest()
+            await run_in_threadpool(self._commit_file, tmp_path, digest)
+        except BaseException:
+            f.close()
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self._uploads += 1
+        return digest, ctype
+
+    def save_bytes(self, data: bytes) -> str:
+        """Synchronous variant for migrations; returns the digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir())
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        self._commit_file(tmp_path, digest)
+        return digest
+
+    # ---------- thumbnails ----------
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is None and self.workers > 0 and Image is not None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            ex, self._executor = self._executor, None
+        if ex is not None:
+            ex.shutdown(wait=True, cancel_futures=True)
+
+    def _thumb_args(self, digest: str) -> Optional[tuple]:
+        dst = self.path(digest, thumb=True)
+        if Image is None or os.path.exists(dst):
+            return None
+        return self.path(digest), dst, self.thumb_size
+
+    def _record_thumb(self, ok: bool) -> bool:
+        with self._lock:
+            if ok:
+                self._thumbnails += 1
+            else:
+                self._thumb_failures += 1
+        return ok
+
+    async def make_thumbnail(self, digest: str) -> bool:
+        args = self._thumb_args(digest)
+        if args is None:
+            return False
+        try:
+            if self.workers == 0:
+                await run_in_threadpool(_thumb_job, *args)
+            else:
+                self.start()
+                await asyncio.get_running_loop().run_in_executor(self._executor, _thumb_job, *args)
+        except Exception:
+            return self._record_thumb(False)
+        return self._record_thumb(True)
+
+    def make_thumbnail_sync(self, digest: str) -> bool:
+        args = self._thumb_args(digest)
+        if args is None:
+            return False
+        try:
+            _thumb_job(*args)
+        except Exception:
+            return self._record_thumb(False)
+        return self._record_thumb(True)
+
+    # ---------- reads ----------
+    def locate(self, ref: str, thumb: bool = False) -> Tuple[str, str, str]:
+        """
+        ref -> (path, content_type, etag). Falls back to the original when no
+        thumbnail exists. Raises 404 if the blob is missing.
+        """
+        digest = ref[len(REF_PREFIX):]
+        if thumb:
+            path = self.path(digest, thumb=True)
+            if os.path.exists(path):
+                return path, "image/jpeg", f'"{digest}-thumb"'
+        path = self.path(digest)
+        try:
+            with open(path, "rb") as f:
+                ctype = sniff(f.read(12)) or "application/octet-stream"
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Photo not found")
+        return path, ctype, f'"{digest}"'
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "root": self.root,
+                "thumbnails_enabled": Image is not None,
+                "workers": self.workers,
+                "uploads": self._uploads,
+                "deduplicated": self._deduplicated,
+                "thumbnails": self._thumbnails,
+                "thumbnail_failures": self._thumb_failures,
+            }
+
+
+photo_store = PhotoStore(
+    settings.PHOTO_DIR,
+    settings.PHOTO_MAX_BYTES,
+    settings.PHOTO_THUMB_SIZE,
+    settings.PHOTO_THUMB_WORKERS,
+)
@@ -0,0 +1,166 @@
+# utils/pool_metrics.py
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+WAIT_BOUNDS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+LIFETIME_BOUNDS_S = (1, 10, 60, 300, 900, 1800, 3600)
+
+
+class Histogram:
+    """Fixed-bucket counts; bucket "<=b" holds observations in (previous b, b]."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect_left(self.bounds, v)] += 1
+        self.n += 1
+        self.total += v
+        self.max = max(self.max, v)
+
+    def snapshot(self) -> dict:
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "count": self.n,
+            "avg": round(self.total / self.n, 3) if self.n else 0.0,
+            "max": round(self.max, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class PoolStats:
+    """Counters for one engine's pool, fed by pool events and InstrumentedPool._do_get."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pool: Optional[Pool] = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.opened = 0
+        self.closed = 0
+        self.wait_ms = Histogram(WAIT_BOUNDS_MS)
+        self.lifetime_s = Histogram(LIFETIME_BOUNDS_S)
+
+    def waited(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_ms.observe(seconds * 1000)
+
+    def timed_out(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def _on_connect(self, dbapi_conn, record) -> None:
+        record.info["opened_at"] = time.monotonic()
+        with self._lock:
+            self.opened += 1
+
+    def _on_close(self, dbapi_conn, record) -> None:
+        opened_at = record.info.pop("opened_at", None)
+        with self._lock:
+            self.closed += 1
+            if opened_at is not None:
+                self.lifetime_s.observe(time.monotonic() - opened_at)
+
+    def _on_close_detached(self, dbapi_conn) -> None:
+        with self._lock:
+            self.closed += 1
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        live = {}
+        if isinstance(pool, QueuePool):
+            live = {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout_s": pool.timeout(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow_in_use": max(pool.overflow(), 0),
+            }
+        with self._lock:
+            return {
+                **live,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "checkout_wait_ms": self.wait_ms.snapshot(),
+                "connections": {
+                    "opened": self.opened,
+                    "closed": self.closed,
+                    "lifetime_s": self.lifetime_s.snapshot(),
+                },
+            }
+
+
+class _TimedCheckout:
+    """
+    Pool mixin timing _do_get: the time a checkout spends waiting for a free
+    slot (plus opening a connection when the pool grows). Pool events fire only
+    after a connection is handed out, so this is the one place the wait is visible.
+    """
+
+    _pool_stats: Optional[PoolStats] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            rec = super()._do_get()
+        except exc.TimeoutError:
+            if self._pool_stats is not None:
+                self._pool_stats.timed_out()
+            raise
+        if self._pool_stats is not None:
+            self._pool_stats.waited(time.perf_counter() - started)
+        return rec
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep feeding the same stats
+        new = super().recreate()
+        new._pool_stats = self._pool_stats
+        if self._pool_stats is not None:
+            self._pool_stats.pool = new
+        return new
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class PoolMetrics:
+    """Registry of per-engine pool stats, served on /admin/metrics."""
+
+    def __init__(self):
+        self._pools: Dict[str, PoolStats] = {}
+
+    def attach(self, name: str, pool: Pool) -> PoolStats:
+        stats = PoolStats()
+        stats.pool = pool
+        if isinstance(pool, _TimedCheckout):
+            pool._pool_stats = stats
+        # listeners live on the pool's dispatch, which recreate() carries over
+        event.listen(pool, "connect", stats._on_connect)
+        event.listen(pool, "close", stats._on_close)
+        event.listen(pool, "close_detached", stats._on_close_detached)
+        self._pools[name] = stats
+        return stats
+
+    def stats(self) -> dict:
+        return {name: s.snapshot() for name, s in self._pools.items()}
+
+
+pool_metrics = PoolMetrics()
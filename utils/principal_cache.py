@@ -0,0 +1,29 @@
+# utils/principal_cache.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+from config import settings
+from utils.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class Principal:
+    """What auth dependencies need about the caller, without a DB session."""
+    user_id: int
+    is_active: bool
+    role: Optional[str]
+    profile: dict  # to_user_response() snapshot (includes the employee block)
+
+    @property
+    def employee(self) -> Optional[dict]:
+        return self.profile.get("employee")
+
+
+# keyed by user_id; writers call invalidate_principal(uid) after commit
+principal_cache = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL)
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.pop(user_id)
@@ -0,0 +1,159 @@
+# utils/read_routing.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers
+from starlette.requests import Request
+
+from config import settings
+from utils.cache import TTLCache
+from utils.security import decode_access_token
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+STICKY_MAX_USERS = 50000
+
+
+def caller_id(authorization: Optional[str]) -> Optional[int]:
+    """user_id from a Bearer access token (cached decode), or None if absent/invalid."""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    try:
+        return int(decode_access_token(authorization[7:].strip())["sub"])
+    except Exception:
+        return None
+
+
+class ReadRouter:
+    """
+    Chooses primary or read replica for read-only requests.
+
+    The replica is used only while the monitor thread's last probe found it up
+    and at most DB_READ_MAX_LAG seconds behind. A caller who has just written
+    is pinned to the primary for DB_READ_STICKY_SECONDS (read-your-writes);
+    that window must outlast DB_READ_MAX_LAG + DB_READ_CHECK_INTERVAL.
+    Sticky state is per worker process.
+    """
+
+    def __init__(self, enabled: bool, max_lag: float, interval: float, sticky_seconds: float):
+        self.enabled = enabled
+        self.max_lag = max_lag
+        self.interval = interval
+        self._sticky = TTLCache(STICKY_MAX_USERS, sticky_seconds)
+        self._probe: Optional[Callable[[], float]] = None
+        self.healthy = False
+        self.lag_s: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.replica_reads = 0
+        self.fallback_reads = 0
+        self.sticky_reads = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- health ----------
+    def check(self) -> bool:
+        try:
+            lag = self._probe()
+        except Exception as e:
+            self.healthy, self.lag_s, self.last_error = False, None, str(e)[:200]
+        else:
+            self.healthy, self.lag_s, self.last_error = lag <= self.max_lag, lag, None
+        self.checked_at = time.time()
+        return self.healthy
+
+    def start(self, probe: Callable[[], float]) -> None:
+        """`probe` returns the replica's lag in seconds and raises if it is unreachable."""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._probe = probe
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="read-replica-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            was = self.healthy
+            if self.check() != was:
+                print(f"🔁 Read replica {'in use' if self.healthy else 'bypassed'}"
+                      f" (lag={self.lag_s}, error={self.last_error})")
+            self._stop.wait(self.interval)
+
+    # ---------- routing ----------
+    def note_write(self, user_id: int) -> None:
+        self._sticky.set(user_id, True)
+
+    def use_replica(self, request: Request) -> bool:
+        """
+        Decide for one request. A sticky caller also gets request.state.fresh_read,
+        which makes the response cache rebuild from the primary instead of serving
+        a body that may have been built from the replica; a replica read gets
+        request.state.replica_read, so the cache will not re-store a body for an
+        entry invalidated within the replica window.
+        """
+        if not self.enabled:
+            return False
+        uid = caller_id(request.headers.get("authorization"))
+        if uid is not None and self._sticky.get(uid) is not None:
+            request.state.fresh_read = True
+            self.sticky_reads += 1
+            return False
+        if not self.healthy:
+            self.fallback_reads += 1
+            return False
+        request.state.replica_read = True
+        self.replica_reads += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "healthy": self.healthy,
+            "lag_s": self.lag_s,
+            "max_lag_s": self.max_lag,
+            "checked_at": self.checked_at,
+            "last_error": self.last_error,
+            "replica_reads": self.replica_reads,
+            "fallback_reads": self.fallback_reads,
+            "sticky_reads": self.sticky_reads,
+            "sticky_users": len(self._sticky),
+        }
+
+
+class StickyWritesMiddleware:
+    """
+    Pure ASGI: after a successful non-GET request, pin its caller to the primary.
+    Marked when the response starts, i.e. after the route committed but before
+    the client can see the result. Safe methods pass straight through.
+    """
+
+    def __init__(self, app, router: ReadRouter):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or not self.router.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_marking(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                uid = caller_id(Headers(scope=scope).get("authorization"))
+                if uid is not None:
+                    self.router.note_write(uid)
+            await send(message)
+
+        await self.app(scope, receive, send_marking)
+
+
+read_router = ReadRouter(
+    enabled=bool(settings.DB_READ_HOST),
+    max_lag=settings.DB_READ_MAX_LAG,
+    interval=settings.DB_READ_CHECK_INTERVAL,
+    sticky_seconds=settings.DB_READ_STICKY_SECONDS,
+)
@@ -0,0 +1,121 @@
+# utils/response_cache.py
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import defaultdict
+from hashlib import sha256
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from config import settings
+from utils.cache import TTLCache
+
+
+def encode_json(obj: Any) -> Tuple[bytes, str]:
+    """JSON bytes + strong ETag (content hash, so every worker derives the same tag)."""
+    body = json.dumps(jsonable_encoder(obj), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return body, '"' + sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    inm = request.headers.get("if-none-match")
+    if not inm:
+        return False
+    if inm.strip() == "*":
+        return True
+    return etag in {t.strip() for t in inm.split(",")}
+
+
+def json_bytes_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """
+    Pre-encoded JSON bodies keyed by (kind, kind_version, id).
+
+    invalidate(kind, id) drops one entity; invalidate(kind) bumps the kind's
+    version so every cached body of that kind (e.g. list pages) is bypassed
+    and ages out of the LRU.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, replica_window: float = 0.0):
+        self._entries = TTLCache(maxsize, ttl)
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        # recent invalidations, so a body read from a lagging replica is not re-cached
+        self._replica_window = replica_window
+        self._recent: TTLCache = TTLCache(maxsize, replica_window or 1)
+        self._kind_invalidated_at: Dict[str, float] = {}
+        self.replica_skips = 0
+
+    def _key(self, kind: str, ident: Hashable) -> tuple:
+        return kind, self._versions[kind], ident
+
+    def get_or_build(self, kind: str, ident: Hashable, build: Callable[[], Any]) -> Tuple[bytes, str]:
+        key = self._key(kind, ident)
+        hit = self._entries.get(key)
+        if hit is not None:
+            return hit
+        encoded = encode_json(build())
+        self._entries.set(key, encoded)
+        return encoded
+
+    def respond(self, request: Request, kind: str, ident: Hashable, build: Callable[[], Any]) -> Response:
+        body, etag = self.get_or_build(kind, ident, build)
+        return json_bytes_response(request, body, etag)
+
+    async def respond_async(
+            self, request: Request, kind: str, ident: Hashable, build: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        """
+        respond() for async routes: `build` is awaited on a miss (e.g. an AsyncSession query).
+        request.state.fresh_read (set by read routing for a caller who just wrote) skips the
+        lookup, so the body is rebuilt from the primary and replaces the cached one.
+        A body built from the replica (request.state.replica_read) is served but not stored
+        if the entry was invalidated within the replica window: the replica may predate the write.
+        """
+        key = self._key(kind, ident)
+        encoded = None if getattr(request.state, "fresh_read", False) else self._entries.get(key)
+        if encoded is None:
+            encoded = encode_json(await build())
+            if getattr(request.state, "replica_read", False) and self._recently_invalidated(kind, ident):
+                self.replica_skips += 1
+            else:
+                self._entries.set(key, encoded)
+        return json_bytes_response(request, *encoded)
+
+    def _recently_invalidated(self, kind: str, ident: Hashable) -> bool:
+        at = self._kind_invalidated_at.get(kind)
+        if at is not None and time.monotonic() - at < self._replica_window:
+            return True
+        return self._recent.get((kind, ident)) is not None
+
+    def invalidate(self, kind: str, ident: Hashable = None) -> None:
+        if ident is None:
+            with self._lock:
+                self._versions[kind] += 1
+                self._kind_invalidated_at[kind] = time.monotonic()
+        else:
+            self._entries.pop(self._key(kind, ident))
+            if self._replica_window:
+                self._recent.set((kind, ident), True)
+
+    def stats(self) -> dict:
+        return {**self._entries.stats(), "replica_skips": self.replica_skips}
+
+
+# The replica window matches read routing's sticky window, which is sized to
+# outlast replica lag (DB_READ_MAX_LAG + DB_READ_CHECK_INTERVAL).
+response_cache = ResponseCache(
+    settings.RESPONSE_CACHE_SIZE,
+    settings.RESPONSE_CACHE_TTL,
+    replica_window=settings.DB_READ_STICKY_SECONDS if settings.DB_READ_HOST else 0.0,
+)
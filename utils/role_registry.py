@@ -0,0 +1,132 @@
+# utils/role_registry.py
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import settings
+from db import SessionLocal
+from models import Role
+from utils.security import normalise_role
+
+
+class RoleRegistry:
+    """
+    In-memory name<->id map of dbo.role_list, loaded once at startup.
+
+    `version` increments on every (re)load or role creation. A lookup miss
+    triggers a reload, so roles created by another worker process are still
+    found, but at most once per ROLE_MISS_RELOAD_INTERVAL (a miss inside the
+    window is answered from memory). On the event loop the reload runs on a
+    background thread and the miss is answered immediately.
+    """
+
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._by_name: Dict[str, int] = {}
+        self._by_id: Dict[int, str] = {}
+        self._loaded = False
+        self._miss_reload_at = float("-inf")
+        self.miss_reloads = 0
+        self.version = 0
+
+    def load(self, db: Optional[Session] = None) -> int:
+        """(Re)load all roles; returns the number loaded."""
+        if db is None:
+            with self._session_factory() as s:
+                return self.load(s)
+        rows = db.execute(select(Role.role_id, Role.role_name)).all()
+        with self._lock:
+            self._by_name = {r.role_name: r.role_id for r in rows}
+            self._by_id = {r.role_id: r.role_name for r in rows}
+            self._loaded = True
+            self.version += 1
+        return len(rows)
+
+    def _load_quietly(self) -> None:
+        try:
+            self.load()
+        except Exception as e:
+            print("⚠️ Role registry reload failed:", e)
+
+    def _reload_on_miss(self) -> bool:
+        """Rate-limited reload; True if the maps were reloaded before returning."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._miss_reload_at < settings.ROLE_MISS_RELOAD_INTERVAL:
+                return False
+            self._miss_reload_at = now
+            self.miss_reloads += 1
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:  # worker thread: a blocking query is fine
+            self.load()
+            return True
+        threading.Thread(target=self._load_quietly, name="role-registry-reload", daemon=True).start()
+        return False
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._reload_on_miss()
+
+    def id_for(self, name: Optional[str]) -> Optional[int]:
+        n = normalise_role(name)
+        if not n:
+            return None
+        self._ensure_loaded()
+        rid = self._by_name.get(n)
+        if rid is None and self._reload_on_miss():
+            rid = self._by_name.get(n)
+        return rid
+
+    def name_for(self, role_id: Optional[int]) -> Optional[str]:
+        if role_id is None:
+            return None
+        self._ensure_loaded()
+        name = self._by_id.get(role_id)
+        if name is None and self._reload_on_miss():
+            name = self._by_id.get(role_id)
+        return name
+
+    def ensure(self, name: str) -> int:
+        """Return the role_id for `name`, creating the role if needed (own transaction)."""
+        n = normalise_role(name)
+        rid = self.id_for(n)
+        if rid is not None:
+            return rid
+        with self._session_factory() as db:
+            r = Role(role_name=n)
+            db.add(r)
+            try:
+                db.commit()
+            except IntegrityError:  # created concurrently elsewhere
+                db.rollback()
+                self.load(db)
+                return self._by_name[n]
+            rid = r.role_id
+        with self._lock:
+            self._by_name[n] = rid
+            self._by_id[rid] = n
+            self.version += 1
+        return rid
+
+    def default_role(self) -> str:
+        env_default = normalise_role(getattr(settings, "DEFAULT_ROLE", None))
+        if env_default and self.id_for(env_default) is not None:
+            return env_default
+        # fallback to EMPLOYEE if exists; else create it
+        self.ensure("EMPLOYEE")
+        return "EMPLOYEE"
+
+    def stats(self) -> dict:
+        return {"roles": len(self._by_id), "version": self.version, "miss_reloads": self.miss_reloads}
+
+
+role_registry = RoleRegistry(SessionLocal)
@@ -1,6 +1,7 @@
 # utils/security.py
 from __future__ import annotations
 
+import time
 from datetime import datetime, timedelta, timezone
 from hashlib import sha256
 from secrets import token_urlsafe
@@ -10,6 +11,7 @@ import jwt
 from passlib.context import CryptContext
 
 from config import settings
+from utils.cache import TTLCache
 
 # ---------------------------
 # Password hashing
@@ -76,22 +78,42 @@ def create_access_token(
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=ALGORITHM)
 
 
+# Verified claims keyed by sha256(token); entries live until the token's exp.
+token_cache = TTLCache(settings.JWT_CACHE_SIZE, settings.ACCESS_MIN * 60)
+
+
 def decode_access_token(token: str) -> dict:
     """Decode & validate an access token (raises if invalid/expired)."""
-    return jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM])
+    key = sha256(token.encode("utf-8")).digest()
+    claims = token_cache.get(key)
+    if claims is not None:
+        # same rule as PyJWT: expired once now >= exp
+        if time.time() >= claims["exp"]:
+            token_cache.pop(key)
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        return dict(claims)
+
+    claims = jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM])
+    if "exp" in claims:
+        token_cache.set(key, claims, ttl=claims["exp"] - time.time())
+    return dict(claims)
 
 
 # ---------------------------
 # Refresh token helpers
 # ---------------------------
+def refresh_digest(raw: str) -> bytes:
+    """32-byte sha256 of a refresh token, as stored in refresh_tokens.token_hash."""
+    return sha256(raw.encode("utf-8")).digest()
+
+
 def make_refresh_token() -> dict:
     """
     Generate a refresh token pair:
-      {"raw": <opaque-token-for-client>, "digest": <sha256-for-db>}
+      {"raw": <opaque-token-for-client>, "digest": <sha256-bytes-for-db>}
     """
     raw = token_urlsafe(48)
-    digest = sha256(raw.encode("utf-8")).hexdigest()
-    return {"raw": raw, "digest": digest}
+    return {"raw": raw, "digest": refresh_digest(raw)}
 
 
 def refresh_exp(days: Optional[int] = None) -> datetime:
@@ -0,0 +1,158 @@
+# utils/token_store.py
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update, delete, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import false, true
+
+from config import settings
+from db import SessionLocal
+from models import RefreshToken
+from utils.security import make_refresh_token, refresh_digest, refresh_exp
+
+
+# ---------------------------
+# Issue / rotate
+# ---------------------------
+def enforce_session_cap(db: Session, user_id: int, cap: Optional[int] = None) -> None:
+    """Revoke the user's oldest live tokens so that one more still fits under the cap."""
+    cap = settings.REFRESH_MAX_SESSIONS if cap is None else cap
+    if cap <= 0:
+        return
+    overflow = (
+        select(RefreshToken.id)
+        .where(
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked == false(),
+            RefreshToken.expires_at > datetime.utcnow(),
+        )
+        .order_by(RefreshToken.id.desc())
+        .offset(cap - 1)
+    )
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id.in_(overflow))
+        .values(revoked=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def add_refresh_token(
+        db: Session, user_id: int, user_agent: Optional[str], ip: Optional[str]
+) -> str:
+    """Stage a new refresh token in the current unit of work; return the raw token."""
+    enforce_session_cap(db, user_id)
+    pair = make_refresh_token()
+    db.add(
+        RefreshToken(
+            user_id=user_id,
+            token_hash=pair["digest"],
+            expires_at=refresh_exp(),
+            user_agent=(user_agent or "")[:255],
+            ip=ip,
+        )
+    )
+    return pair["raw"]
+
+
+def revoke_refresh_token(db: Session, raw: str) -> Optional[int]:
+    """
+    Revoke-and-return in one statement: of two concurrent uses of the same
+    token only one matches `revoked = 0`, the other gets None back.
+    """
+    return db.scalar(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == refresh_digest(raw),
+            RefreshToken.revoked == false(),
+            RefreshToken.expires_at > datetime.utcnow(),
+        )
+        .values(revoked=True)
+        .returning(RefreshToken.user_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# ---------------------------
+# Background pruning
+# ---------------------------
+def sweep_once(db: Session, batch: int) -> int:
+    """Delete up to `batch` expired or revoked rows; return how many went."""
+    ids = db.scalars(
+        select(RefreshToken.id)
+        .where(or_(RefreshToken.revoked == true(), RefreshToken.expires_at <= datetime.utcnow()))
+        .limit(batch)
+    ).all()
+    if not ids:
+        return 0
+    db.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return len(ids)
+
+
+class RefreshTokenSweeper:
+    """
+    Daemon thread that prunes dbo.refresh_tokens in small batches.
+    Full batches are followed by a short pause (REFRESH_SWEEP_PAUSE) so the
+    backlog drains at a bounded rate; once caught up it sleeps REFRESH_SWEEP_INTERVAL.
+    """
+
+    def __init__(self, session_factory, batch: int, pause: float, interval: float):
+        self._session_factory = session_factory
+        self.batch = max(1, batch)
+        self.pause = pause
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.deleted = 0
+        self.runs = 0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="refresh-token-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            n = 0
+            try:
+                with self._session_factory() as db:
+                    n = sweep_once(db, self.batch)
+                self.deleted += n
+                self.last_error = None
+            except Exception as e:  # keep sweeping on transient DB errors
+                self.last_error = str(e)
+            self.runs += 1
+            self._stop.wait(self.pause if n >= self.batch else self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "runs": self.runs,
+            "deleted": self.deleted,
+            "last_error": self.last_error,
+        }
+
+
+refresh_token_sweeper = RefreshTokenSweeper(
+    SessionLocal,
+    batch=settings.REFRESH_SWEEP_BATCH,
+    pause=settings.REFRESH_SWEEP_PAUSE,
+    interval=settings.REFRESH_SWEEP_INTERVAL,
+)
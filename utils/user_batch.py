@@ -0,0 +1,108 @@
+# utils/user_batch.py
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from models import AuthUser, Employee
+from utils.chunking import in_chunks
+from utils.role_registry import role_registry
+from utils.security import normalise_role
+
+EMPLOYEE_PATCH_FIELDS = [
+    "full_name", "phone", "address", "fathers_name", "aadhar_no",
+    "date_of_birth", "work_position", "card_id",
+    "dept_id", "sub_dept_id", "designation_id",
+]
+
+FieldSet = Tuple[Tuple[str, object], ...]
+
+
+def _split_item(item: dict) -> Tuple[FieldSet, FieldSet]:
+    """One patch item -> (user-level field set, employee-level field set), both hashable."""
+    user_vals = {}
+    if "is_active" in item:
+        user_vals["is_active"] = bool(item["is_active"])
+    if item.get("role"):
+        user_vals["role"] = normalise_role(item["role"])  # resolved in apply_patches
+
+    emp_vals = {}
+    for field in EMPLOYEE_PATCH_FIELDS:
+        if field in item:
+            v = item[field]
+            if field == "date_of_birth" and isinstance(v, str):
+                v = date.fromisoformat(v)
+            emp_vals[field] = v
+    return tuple(sorted(user_vals.items())), tuple(sorted(emp_vals.items()))
+
+
+def group_patches(items: List[dict]) -> Tuple[Dict[FieldSet, List[int]], Dict[FieldSet, List[int]]]:
+    """
+    Group user_ids by identical field->value sets, so e.g. 300 people moved to the
+    same dept/sub-dept become one UPDATE ... WHERE user_id IN (...).
+    A later item for the same user_id overrides an earlier one.
+    """
+    latest: Dict[int, dict] = {}
+    for item in items:
+        try:
+            latest[int(item["user_id"])] = {**latest.get(int(item["user_id"]), {}), **item}
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Every item needs an integer user_id")
+
+    user_groups: Dict[FieldSet, List[int]] = defaultdict(list)
+    emp_groups: Dict[FieldSet, List[int]] = defaultdict(list)
+    for uid, item in latest.items():
+        try:
+            u_set, e_set = _split_item(item)
+            hash((u_set, e_set))
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"user_id {uid}: {e}")
+        if u_set:
+            user_groups[u_set].append(uid)
+        if e_set:
+            emp_groups[e_set].append(uid)
+    return user_groups, emp_groups
+
+
+def _resolve_roles(user_groups: Dict[FieldSet, List[int]]) -> Dict[FieldSet, List[int]]:
+    """Swap role names for user_role_id; unknown roles are a 400 (a PATCH never creates roles)."""
+    names = {v for fields in user_groups for k, v in fields if k == "role"}
+    ids = {n: role_registry.id_for(n) for n in names}
+    unknown = sorted(n for n, rid in ids.items() if rid is None)
+    if unknown:
+        raise HTTPException(status_code=400, detail={"message": "Unknown roles", "roles": unknown})
+    return {
+        tuple(sorted(("user_role_id", ids[v]) if k == "role" else (k, v) for k, v in fields)): uids
+        for fields, uids in user_groups.items()
+    }
+
+
+def apply_patches(db: Session, items: List[dict]) -> List[int]:
+    """Set-based UPDATEs for a batch of partial updates; caller commits. Returns user_ids."""
+    user_groups, emp_groups = group_patches(items)
+    ids = sorted({uid for g in (*user_groups.values(), *emp_groups.values()) for uid in g})
+
+    found = set()
+    for chunk in in_chunks(ids):
+        found.update(db.scalars(select(AuthUser.user_id).where(AuthUser.user_id.in_(chunk))))
+    missing = [uid for uid in ids if uid not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail={"message": "Users not found", "user_ids": missing})
+    user_groups = _resolve_roles(user_groups)
+
+    now = datetime.utcnow()
+    for model, groups in ((AuthUser, user_groups), (Employee, emp_groups)):
+        for fields, uids in groups.items():
+            for chunk in in_chunks(uids):
+                db.execute(
+                    update(model)
+                    .where(model.user_id.in_(chunk))
+                    .values(**dict(fields), updated_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+    return ids
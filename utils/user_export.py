@@ -0,0 +1,83 @@
+# utils/user_export.py
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterator
+
+from sqlalchemy import select, Select
+
+from db import SessionLocal
+from models import AuthUser, Role, Employee
+from utils.user_queries import UserFilters, apply_user_filters
+
+EXPORT_BATCH = 1000  # rows per server-side fetch and per emitted chunk
+
+EXPORT_COLUMNS = [
+    AuthUser.user_id,
+    AuthUser.email,
+    AuthUser.is_active,
+    Role.role_name.label("role"),
+    Employee.employee_id,
+    Employee.card_id,
+    Employee.full_name,
+    Employee.phone,
+    Employee.address,
+    Employee.fathers_name,
+    Employee.date_of_birth,
+    Employee.work_position,
+    Employee.dept_id,
+    Employee.sub_dept_id,
+    Employee.designation_id,
+    AuthUser.created_at,
+    AuthUser.updated_at,
+    AuthUser.last_active,
+]
+
+
+def export_query(filters: UserFilters) -> Select:
+    """Core SELECT over users + roles + employees (no ORM objects are built)."""
+    stmt = (
+        select(*EXPORT_COLUMNS)
+        .select_from(AuthUser)
+        .outerjoin(Role, Role.role_id == AuthUser.user_role_id)
+        .outerjoin(Employee, Employee.user_id == AuthUser.user_id)
+        .order_by(AuthUser.user_id)
+    )
+    return apply_user_filters(stmt, filters)
+
+
+def _json_default(v):
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    raise TypeError(type(v).__name__)
+
+
+def iter_export(stmt: Select, fmt: str, session_factory=SessionLocal) -> Iterator[str]:
+    """
+    Yield CSV or NDJSON text in chunks of EXPORT_BATCH rows.
+    Owns its session: FastAPI closes `get_db` before a streaming body is sent.
+    """
+    with session_factory() as db:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH))
+        keys = list(result.keys())
+        buf = io.StringIO()
+        writer = csv.writer(buf) if fmt == "csv" else None
+        if writer:
+            writer.writerow(keys)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+
+        for partition in result.partitions():
+            for row in partition:
+                if writer:
+                    writer.writerow(row)
+                else:
+                    buf.write(json.dumps(dict(zip(keys, row)), default=_json_default))
+                    buf.write("\n")
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
@@ -0,0 +1,184 @@
+# utils/user_import.py
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select, insert, func
+from sqlalchemy.orm import Session
+
+from models import AuthUser, Employee
+from utils.chunking import in_chunks
+from utils.role_registry import role_registry
+from utils.security import normalise_role
+
+INSERT_BATCH = 500
+
+REQUIRED = ["email", "password", "employee_id", "full_name"]
+TEXT_FIELDS = ["phone", "address", "fathers_name", "aadhar_no", "work_position", "card_id"]
+INT_FIELDS = ["dept_id", "sub_dept_id", "designation_id"]
+
+
+# ---------------------------
+# Parsing
+# ---------------------------
+def parse_rows(body: bytes, content_type: str) -> List[dict]:
+    """CSV (text/csv) or NDJSON (anything else) -> list of dicts."""
+    text = body.decode("utf-8-sig")
+    if "csv" in (content_type or ""):
+        return [dict(r) for r in csv.DictReader(io.StringIO(text))]
+    rows = []
+    for n, line in enumerate(text.splitlines(), 1):
+        if line.strip():
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                obj = {"__error__": f"Line {n}: invalid JSON"}
+            if not isinstance(obj, dict):
+                obj = {"__error__": f"Line {n}: expected a JSON object"}
+            rows.append(obj)
+    return rows
+
+
+def _clean(v) -> Optional[str]:
+    if v is None:
+        return None
+    v = str(v).strip()
+    return v or None
+
+
+def validate_row(raw: dict) -> tuple[dict, List[str]]:
+    """Return (normalised_row, errors)."""
+    if "__error__" in raw:
+        return {}, [raw["__error__"]]
+    row = {k: _clean(raw.get(k)) for k in REQUIRED + TEXT_FIELDS + ["role", "date_of_birth"]}
+    errors = [f"{k} is required" for k in REQUIRED if not row[k]]
+
+    for k in INT_FIELDS:
+        v = _clean(raw.get(k))
+        try:
+            row[k] = int(v) if v is not None else None
+        except ValueError:
+            errors.append(f"{k} must be an integer")
+
+    if row["date_of_birth"]:
+        try:
+            row["date_of_birth"] = date.fromisoformat(row["date_of_birth"])
+        except ValueError:
+            errors.append("date_of_birth must be YYYY-MM-DD")
+
+    row["role"] = normalise_role(row["role"])
+    return row, errors
+
+
+# ---------------------------
+# Set-based existence checks
+# ---------------------------
+def existing_values(db: Session, column, values: Iterable[str]) -> Set[str]:
+    vals = list(set(values))
+    found: Set[str] = set()
+    for chunk in in_chunks(vals):
+        found.update(db.scalars(select(column).where(column.in_(chunk))).all())
+    return found
+
+
+def existing_emails(db: Session, emails: Iterable[str]) -> Set[str]:
+    """
+    Lower-cased emails already taken. MSSQL's default collation is case-insensitive,
+    so a plain IN (index seek) already matches case variants; elsewhere compare lower().
+    """
+    vals = list({e.lower() for e in emails})
+    col = AuthUser.email if db.get_bind().dialect.name == "mssql" else func.lower(AuthUser.email)
+    found: Set[str] = set()
+    for chunk in in_chunks(vals):
+        found.update(v.lower() for v in db.scalars(select(AuthUser.email).where(col.in_(chunk))))
+    return found
+
+
+def prepare_import(db: Session, raw_rows: List[dict]) -> tuple[List[dict], List[dict]]:
+    """
+    Validate everything up front.
+    Returns (report, accepted) where accepted rows carry their report index in "_i".
+    """
+    report: List[dict] = []
+    candidates: List[dict] = []
+    for i, raw in enumerate(raw_rows):
+        row, errors = validate_row(raw)
+        report.append({"row": i + 1, "status": "invalid" if errors else "pending", "errors": errors})
+        if not errors:
+            row["_i"] = i
+            candidates.append(row)
+
+    taken_emails = existing_emails(db, (r["email"] for r in candidates))
+    taken_emp_ids = existing_values(db, Employee.employee_id, (r["employee_id"] for r in candidates))
+
+    accepted: List[dict] = []
+    seen_emails: Set[str] = set()
+    seen_emp_ids: Set[str] = set()
+    for r in candidates:
+        errors = []
+        email = r["email"].lower()
+        if email in taken_emails:
+            errors.append("Email already exists")
+        elif email in seen_emails:
+            errors.append("Duplicate email in upload")
+        if r["employee_id"] in taken_emp_ids:
+            errors.append("employee_id already exists")
+        elif r["employee_id"] in seen_emp_ids:
+            errors.append("Duplicate employee_id in upload")
+        seen_emails.add(email)
+        seen_emp_ids.add(r["employee_id"])
+        if errors:
+            report[r["_i"]].update(status="duplicate", errors=errors)
+        else:
+            accepted.append(r)
+    return report, accepted
+
+
+# ---------------------------
+# Batched insert
+# ---------------------------
+def insert_accepted(db: Session, accepted: List[dict], hashes: List[str], report: List[dict]) -> None:
+    """
+    Insert users then employees in INSERT_BATCH-sized executemany batches
+    (insertmanyvalues for the RETURNING insert, fast_executemany for the rest).
+    The caller owns the transaction.
+    """
+    role_ids: Dict[Optional[str], int] = {}
+    default_role = role_registry.default_role()
+    for name in {r["role"] or default_role for r in accepted}:
+        role_ids[name] = role_registry.ensure(name)
+
+    for start in range(0, len(accepted), INSERT_BATCH):
+        batch = accepted[start:start + INSERT_BATCH]
+        user_rows = [
+            {
+                "email": r["email"],
+                "password_hash": h,
+                "user_role_id": role_ids[r["role"] or default_role],
+            }
+            for r, h in zip(batch, hashes[start:start + INSERT_BATCH])
+        ]
+        ids = db.execute(
+            insert(AuthUser).returning(AuthUser.user_id, AuthUser.email, sort_by_parameter_order=True),
+            user_rows,
+        ).all()
+        uid_by_email = {row.email: row.user_id for row in ids}
+
+        emp_rows = [
+            {
+                "user_id": uid_by_email[r["email"]],
+                "employee_id": r["employee_id"],
+                "full_name": r["full_name"],
+                "date_of_birth": r["date_of_birth"],
+                **{k: r[k] for k in TEXT_FIELDS + INT_FIELDS},
+            }
+            for r in batch
+        ]
+        db.execute(insert(Employee), emp_rows)
+
+        for r in batch:
+            report[r["_i"]].update(status="created", user_id=uid_by_email[r["email"]])
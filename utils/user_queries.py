@@ -0,0 +1,159 @@
+# utils/user_queries.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Select
+from sqlalchemy.orm import contains_eager, load_only
+from sqlalchemy.sql import false
+
+from models import AuthUser, Employee
+from utils.role_registry import role_registry
+
+
+def _prefix(v: str) -> str:
+    """LIKE pattern for an index-friendly prefix match (wildcards in input are literal)."""
+    v = v.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_").replace("[", "\\[")
+    return f"{v}%"
+
+
+@dataclass
+class UserFilters:
+    q: Optional[str] = None  # email prefix
+    name: Optional[str] = None  # full_name prefix
+    employee_id: Optional[str] = None
+    card_id: Optional[str] = None
+    dept_id: Optional[int] = None
+    sub_dept_id: Optional[int] = None
+    designation_id: Optional[int] = None
+    role: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+def user_filters(
+        q: Optional[str] = Query(None, description="Email prefix"),
+        name: Optional[str] = Query(None, description="Full-name prefix"),
+        employee_id: Optional[str] = None,
+        card_id: Optional[str] = None,
+        dept_id: Optional[int] = None,
+        sub_dept_id: Optional[int] = None,
+        designation_id: Optional[int] = None,
+        role: Optional[str] = None,
+        is_active: Optional[bool] = None,
+) -> UserFilters:
+    """FastAPI dependency collecting the /auth/users filter parameters."""
+    return UserFilters(q, name, employee_id, card_id, dept_id, sub_dept_id, designation_id, role, is_active)
+
+
+def apply_user_filters(stmt: Select, f: UserFilters) -> Select:
+    """
+    Translate filters to SQL. `stmt` must already join Employee.
+    Every predicate is sargable: equality or LIKE 'prefix%' on an indexed column.
+    """
+    if f.q:
+        stmt = stmt.where(AuthUser.email.like(_prefix(f.q), escape="\\"))
+    if f.name:
+        stmt = stmt.where(Employee.full_name.like(_prefix(f.name), escape="\\"))
+    if f.employee_id:
+        stmt = stmt.where(Employee.employee_id == f.employee_id)
+    if f.card_id:
+        stmt = stmt.where(Employee.card_id == f.card_id)
+    if f.dept_id is not None:
+        stmt = stmt.where(Employee.dept_id == f.dept_id)
+    if f.sub_dept_id is not None:
+        stmt = stmt.where(Employee.sub_dept_id == f.sub_dept_id)
+    if f.designation_id is not None:
+        stmt = stmt.where(Employee.designation_id == f.designation_id)
+    if f.role:
+        role_id = role_registry.id_for(f.role)
+        stmt = stmt.where(AuthUser.user_role_id == role_id if role_id is not None else false())
+    if f.is_active is not None:
+        stmt = stmt.where(AuthUser.is_active == f.is_active)
+    return stmt
+
+
+# ---------------------------
+# Sparse fieldsets (?fields=)
+# ---------------------------
+USER_FIELDS = ("user_id", "email", "full_name", "is_active", "created_at", "updated_at", "last_active", "role", "employee")
+USER_COLUMNS = {"user_id", "email", "is_active", "created_at", "updated_at", "last_active"}
+EMPLOYEE_FIELDS = (
+    "employee_id", "full_name", "phone", "address", "fathers_name", "aadhar_no", "date_of_birth",
+    "work_position", "card_id", "dept_id", "sub_dept_id", "designation_id", "created_at", "updated_at",
+)
+
+
+@dataclass(frozen=True)
+class ProjectionFields:
+    top: Tuple[str, ...]  # top-level keys, in response order
+    employee: Tuple[str, ...]  # keys of the nested "employee" object
+
+
+def parse_fields(raw: Optional[str]) -> Optional[ProjectionFields]:
+    """
+    "user_id,email,full_name" or "employee.dept_id" -> ProjectionFields; None/"" = full response.
+    "employee" alone selects the whole employee block.
+    """
+    if not raw or not raw.strip():
+        return None
+    top, emp, unknown = set(), set(), []
+    for name in (p.strip() for p in raw.split(",")):
+        if not name:
+            continue
+        if name.startswith("employee."):
+            sub = name[len("employee."):]
+            if sub not in EMPLOYEE_FIELDS:
+                unknown.append(name)
+                continue
+            top.add("employee")
+            emp.add(sub)
+        elif name == "employee":
+            top.add("employee")
+            emp.update(EMPLOYEE_FIELDS)
+        elif name in USER_FIELDS:
+            top.add(name)
+        else:
+            unknown.append(name)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ProjectionFields(
+        top=tuple(f for f in USER_FIELDS if f in top),
+        employee=tuple(f for f in EMPLOYEE_FIELDS if f in emp),
+    )
+
+
+def projection_options(fs: ProjectionFields, keyset: Tuple[str, ...] = ("user_id", "created_at")) -> List:
+    """
+    load_only() options for a statement that already outer-joins Employee.
+    `keyset` columns are always loaded (cursor encoding). Employee is only
+    populated when one of its columns was asked for; otherwise it is never read.
+    """
+    user_cols = set(keyset) | (USER_COLUMNS & set(fs.top))
+    if "role" in fs.top:
+        user_cols.add("user_role_id")
+    opts = [load_only(*(getattr(AuthUser, c) for c in sorted(user_cols)))]
+
+    emp_cols = set(fs.employee)
+    if "full_name" in fs.top:
+        emp_cols.add("full_name")
+    if emp_cols:
+        opts.append(contains_eager(AuthUser.Employee).load_only(*(getattr(Employee, c) for c in sorted(emp_cols))))
+    return opts
+
+
+def shape_user(u: AuthUser, fs: ProjectionFields) -> dict:
+    """Build only the requested keys; never touches attributes projection_options() skipped."""
+    out = {}
+    for f in fs.top:
+        if f in USER_COLUMNS:
+            out[f] = getattr(u, f)
+        elif f == "role":
+            out[f] = role_registry.name_for(u.user_role_id)
+        elif f == "full_name":
+            out[f] = u.Employee.full_name if u.Employee and u.Employee.full_name else None
+        elif f == "employee":
+            e = u.Employee
+            out[f] = {k: getattr(e, k) for k in fs.employee} if e else None
+    return out
@@ -0,0 +1,113 @@
+# utils/write_behind.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import update
+
+from config import settings
+from db import SessionLocal
+from models import AuthUser
+
+
+class UserTouchBuffer:
+    """
+    Write-behind queue for non-critical AuthUser columns (e.g. last_active).
+
+    touch() only records the latest values per user_id; a daemon thread
+    flushes everything as one executemany UPDATE every `interval` seconds,
+    or sooner once `max_entries` users are pending. stop() flushes what is left.
+    """
+
+    def __init__(self, session_factory, interval: float, max_entries: int):
+        self._session_factory = session_factory
+        self.interval = interval
+        self.max_entries = max(1, max_entries)
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.touches = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.last_error: Optional[str] = None
+
+    def touch(self, user_id: int, **values: Any) -> None:
+        with self._lock:
+            self._pending.setdefault(user_id, {}).update(values)
+            self.touches += 1
+            full = len(self._pending) >= self.max_entries
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+
+        started = time.perf_counter()
+        try:
+            with self._session_factory() as db:
+                db.execute(update(AuthUser), [{"user_id": uid, **vals} for uid, vals in batch.items()])
+                db.commit()
+        except Exception as e:
+            # put them back; newer touches recorded meanwhile win
+            with self._lock:
+                for uid, vals in batch.items():
+                    self._pending[uid] = {**vals, **self._pending.get(uid, {})}
+            self.last_error = str(e)
+            return 0
+
+        elapsed = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.rows_flushed += len(batch)
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+        self.last_error = None
+        return len(batch)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="user-touch-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+        self.flush()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            depth = len(self._pending)
+        return {
+            "queue_depth": depth,
+            "touches": self.touches,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "last_error": self.last_error,
+        }
+
+
+user_touches = UserTouchBuffer(
+    SessionLocal,
+    interval=settings.TOUCH_FLUSH_INTERVAL,
+    max_entries=settings.TOUCH_FLUSH_MAX,
+)